@@ -0,0 +1,119 @@
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.log_config import get_logger
+
+logger = get_logger("autotune")
+
+@dataclass
+class ConcurrencyChange:
+    elapsed: float
+    old: int
+    new: int
+    reason: str
+    throughput: float
+    latency: float
+    error_rate: float
+
+    def describe(self) -> str:
+        return (f"t={self.elapsed:.0f}s {self.old} -> {self.new}: {self.reason} "
+                f"({self.throughput:.2f} pages/s, median {self.latency:.1f}s, {self.error_rate:.0%} errors)")
+
+class ConcurrencyTuner:
+    """AIMD hill-climber for how many pages are fetched at once.
+
+    After every batch it looks at pages/sec, the error rate (smoothed) and
+    the median page latency. Errors above `error_threshold` halve
+    concurrency. Otherwise it probes one page higher and keeps the extra
+    page only if the next batch beats the throughput measured at the old
+    level by `gain_margin`; a probe that gains less is undone and the tuner
+    holds for `cooldown` batches, longer after each failed probe in a row.
+    Latency beyond `latency_factor` times the best seen, when the level
+    below delivered as much throughput, cuts concurrency by a quarter.
+    Every change is kept in `changes`.
+    """
+
+    def __init__(self, initial: int, min_concurrency: int = 1, max_concurrency: int = 20,
+                 error_threshold: float = 0.2, latency_factor: float = 2.0, cooldown: int = 3,
+                 gain_margin: float = 0.05):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max(min_concurrency, max_concurrency)
+        self.concurrency = min(max(initial, self.min_concurrency), self.max_concurrency)
+        self.initial = self.concurrency
+        self.error_threshold = error_threshold
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.gain_margin = gain_margin
+        self.changes: List[ConcurrencyChange] = []
+        self._error_rate: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        self._level_throughput: Dict[int, float] = {}  # Mean pages/s of the batches last run at each level
+        self._level_batches = 0
+        self._probe_from: Optional[int] = None  # Level the current probe stepped up from
+        self._failed_probes = 0
+        self._hold = 0
+        self._started = time.monotonic()
+
+    def observe_batch(self, pages: int, errors: int, latencies: List[float], elapsed: float):
+        """Feed one finished batch: pages attempted, how many failed, their latencies and wall time"""
+        if pages <= 0 or elapsed <= 0:
+            return
+        throughput = (pages - errors) / elapsed
+        latency = statistics.median(latencies) if latencies else elapsed
+        # The error rate is smoothed; single small batches are too noisy to act on
+        error_rate = errors / pages
+        if self._error_rate is not None:
+            error_rate = 0.5 * error_rate + 0.5 * self._error_rate
+        self._error_rate = error_rate
+        if errors < pages:
+            self._best_latency = latency if self._best_latency is None else min(self._best_latency, latency)
+        self._level_batches += 1
+        if self._level_batches == 1:
+            self._level_throughput[self.concurrency] = throughput
+        else:
+            mean = self._level_throughput[self.concurrency]
+            self._level_throughput[self.concurrency] = mean + (throughput - mean) / self._level_batches
+        stats = (throughput, latency, error_rate)
+        probe_from, self._probe_from = self._probe_from, None
+        below = self._level_throughput.get(self.concurrency - 1)
+
+        if error_rate > self.error_threshold:
+            self._change(max(self.min_concurrency, self.concurrency // 2), f"error rate above {self.error_threshold:.0%}", stats)
+            self._hold = self.cooldown
+        elif probe_from is not None and throughput < self._level_throughput[probe_from] * (1 + self.gain_margin):
+            self._failed_probes += 1
+            self._change(probe_from, f"increase gained under {self.gain_margin:.0%} throughput", stats)
+            # Back off from re-probing a level that keeps failing
+            self._hold = self.cooldown * 2 ** min(self._failed_probes - 1, 3)
+        elif (self._best_latency and latency > self.latency_factor * self._best_latency
+              and below is not None and throughput <= below):
+            self._change(max(self.min_concurrency, int(self.concurrency * 0.75)), "latency rising without throughput gain", stats)
+            self._hold = self.cooldown
+        elif self._hold:
+            self._hold -= 1
+        elif self.concurrency < self.max_concurrency:
+            if probe_from is not None:
+                self._failed_probes = 0
+            from_level = self.concurrency
+            self._change(self.concurrency + 1, "probing for more throughput", stats)
+            self._probe_from = from_level
+
+    def _change(self, new: int, reason: str, stats):
+        if new == self.concurrency:
+            return
+        throughput, latency, error_rate = stats
+        change = ConcurrencyChange(time.monotonic() - self._started, self.concurrency, new, reason,
+                                   throughput, latency, error_rate)
+        self.changes.append(change)
+        logger.info("Concurrency %s", change.describe())
+        self.concurrency = new
+        self._level_batches = 0
+
+    def summary(self) -> str:
+        peak = max([self.initial] + [change.new for change in self.changes])
+        return f"concurrency {self.initial} -> {self.concurrency} (peak {peak}, {len(self.changes)} changes)"
+
+    def report(self) -> List[str]:
+        return [change.describe() for change in self.changes]
@@ -0,0 +1,172 @@
+import contextlib
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+# Resource types (as reported by Playwright) that never end up in the markdown
+DEFAULT_BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Third-party hosts that only serve analytics, ads and tracking scripts
+DEFAULT_BLOCKED_DOMAINS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "clarity.ms",
+    "newrelic.com",
+    "nr-data.net",
+    "optimizely.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "adnxs.com",
+    "intercom.io",
+    "hubspot.com",
+}
+
+@dataclass
+class BlockStats:
+    blocked_requests: int = 0
+    allowed_requests: int = 0
+    allowed_bytes: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+    blocked_by_domain: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (f"blocked {self.blocked_requests} requests, "
+                f"loaded {self.allowed_requests} "
+                f"({self.allowed_bytes / (1024 * 1024):.1f} MB)")
+
+@dataclass
+class ResourceBlockProfile:
+    """Aborts browser requests by resource type and third-party domain.
+
+    The profile is attached to an AsyncWebCrawler through crawl4ai's
+    on_page_context_created hook, so every page the crawler opens routes its
+    requests through `_handle_route`. Counts are kept per run in `stats`;
+    when several crawls share the profile (JobQueue), each also gets its
+    own counts for the pages it loads through `track()`.
+    """
+    blocked_resource_types: Set[str] = field(
+        default_factory=lambda: set(DEFAULT_BLOCKED_RESOURCE_TYPES))
+    blocked_domains: Set[str] = field(
+        default_factory=lambda: set(DEFAULT_BLOCKED_DOMAINS))
+    enabled: bool = True
+    stats: BlockStats = field(default_factory=BlockStats)
+
+    def __post_init__(self):
+        self._tracked: Dict[str, BlockStats] = {}  # url -> counters of the crawl loading it
+        self._page_stats = weakref.WeakKeyDictionary()
+
+    def reset_stats(self):
+        """Start a fresh set of counters for a new crawl run"""
+        self.stats = BlockStats()
+
+    @contextlib.contextmanager
+    def track(self, url: str, stats: BlockStats):
+        """Also count the requests of the page loaded for `url` into `stats`"""
+        self._tracked[url] = stats
+        try:
+            yield
+        finally:
+            if self._tracked.get(url) is stats:
+                del self._tracked[url]
+
+    def attach(self, crawler):
+        """Install the interception hooks on a crawl4ai AsyncWebCrawler.
+
+        The hooks go in even while blocking is off: pooled browsers outlive
+        the setting, so `enabled` is checked per request instead.
+        """
+        crawler.crawler_strategy.set_hook("on_page_context_created", self._on_page_created)
+        crawler.crawler_strategy.set_hook("before_goto", self._before_goto)
+
+    def blocked_domain(self, host: str) -> Optional[str]:
+        """The blocklist entry matching the host or one of its parent domains"""
+        host = host.lower().split(':')[0]
+        parts = host.split('.')
+        for i in range(len(parts) - 1):
+            domain = '.'.join(parts[i:])
+            if domain in self.blocked_domains:
+                return domain
+        return None
+
+    def is_blocked_domain(self, host: str) -> bool:
+        return self.blocked_domain(host) is not None
+
+    def block_reason(self, url: str, resource_type: str, page_url: Optional[str] = None) -> Optional[str]:
+        """Return why a request should be aborted, or None to let it through.
+
+        The domain blocklist only applies to third-party requests: when the
+        page itself is on a listed domain (crawling hubspot.com), that
+        site's own scripts, XHR and CSS load normally.
+        """
+        if resource_type in self.blocked_resource_types:
+            return f"type:{resource_type}"
+        host = urlparse(url).hostname or ""
+        domain = self.blocked_domain(host) if host else None
+        if domain:
+            page_host = (urlparse(page_url).hostname or "").lower() if page_url else ""
+            if page_host == domain or page_host.endswith("." + domain):
+                return None
+            return f"domain:{host}"
+        return None
+
+    async def _on_page_created(self, page, context=None, **kwargs):
+        async def handle_route(route):
+            await self._handle_route(route, page)
+
+        await page.route("**/*", handle_route)
+        page.on("response", lambda response: self._record_response(response, page))
+        return page
+
+    async def _before_goto(self, page, context=None, url=None, **kwargs):
+        stats = self._tracked.get(url)
+        if stats is not None:
+            self._page_stats[page] = stats
+        return page
+
+    def _stats_for(self, page) -> List[BlockStats]:
+        tracked = self._page_stats.get(page) if page is not None else None
+        return [self.stats] if tracked is None else [self.stats, tracked]
+
+    async def _handle_route(self, route, page=None):
+        if not self.enabled:
+            await route.continue_()
+            return
+        request = route.request
+        # Never abort the page we were asked to crawl, even on a listed domain
+        reason = None
+        if not request.is_navigation_request():
+            reason = self.block_reason(request.url, request.resource_type, page.url if page is not None else None)
+        if reason is None:
+            await route.continue_()
+            return
+
+        kind, _, key = reason.partition(':')
+        for stats in self._stats_for(page):
+            stats.blocked_requests += 1
+            bucket = stats.blocked_by_type if kind == "type" else stats.blocked_by_domain
+            bucket[key] = bucket.get(key, 0) + 1
+        await route.abort("blockedbyclient")
+
+    def _record_response(self, response, page=None):
+        if not self.enabled:
+            return
+        length = response.headers.get("content-length")
+        for stats in self._stats_for(page):
+            stats.allowed_requests += 1
+            if length and length.isdigit():
+                stats.allowed_bytes += int(length)
@@ -0,0 +1,231 @@
+"""Indexed binary corpus export, and a memory-mapped reader for it.
+
+A .corpus file holds every page's URL and UTF-8 body back to back, then a
+fixed-width entry table in page order and a URL-hash lookup table, then
+JSON metadata. A 64-byte header points at each section, so a reader maps
+the file once and finds any page with a binary search, without reading
+the rest of a multi-GB crawl.
+
+    with CorpusReader("site.corpus") as corpus:
+        text = corpus["https://example.com/docs"]
+        for start, stop in corpus.shards(8):   # one range per worker
+            ...
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.page_cache import canonical_url
+
+CORPUS_SUFFIX = ".corpus"
+MAGIC = b"WCCORPUS"
+VERSION = 1
+# magic, version, page count, entries offset, lookup offset, metadata offset, metadata length
+_HEADER = struct.Struct("<8sIxxxxQQQQQ")
+HEADER_SIZE = 64
+
+ENTRY_DTYPE = np.dtype([("offset", "<u8"), ("url_length", "<u4"), ("body_length", "<u4"), ("score", "<f4"), ("reserved", "<u4")])
+LOOKUP_DTYPE = np.dtype([("hash", "<u8"), ("entry", "<u8")])
+
+def url_hash(url: str) -> int:
+    """64-bit key of a URL; spelling variants that canonicalize alike share it"""
+    digest = hashlib.blake2b(canonical_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def _align(f, boundary: int = 8):
+    padding = -f.tell() % boundary
+    if padding:
+        f.write(b"\0" * padding)
+
+class CorpusWriter:
+    """Streams pages into a .corpus file; the index is written on close().
+
+    Only the fixed-width index entries are kept in memory. The file is
+    built under a temporary name and moved into place when complete.
+    """
+
+    def __init__(self, path: str, metadata: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(b"\0" * HEADER_SIZE)
+        self._offsets = array('Q')
+        self._url_lengths = array('I')
+        self._body_lengths = array('I')
+        self._scores = array('f')
+        self._hashes = array('Q')
+
+    def add(self, url: str, text: str, score: Optional[float] = None):
+        url_bytes = url.encode('utf-8')
+        body = text.encode('utf-8')
+        self._offsets.append(self._file.tell())
+        self._url_lengths.append(len(url_bytes))
+        self._body_lengths.append(len(body))
+        self._scores.append(float("nan") if score is None else score)
+        self._hashes.append(url_hash(url))
+        self._file.write(url_bytes)
+        self._file.write(body)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self):
+        f = self._file
+        count = len(self._offsets)
+        _align(f)
+        entries_offset = f.tell()
+        entries = np.zeros(count, dtype=ENTRY_DTYPE)
+        entries["offset"] = np.frombuffer(self._offsets, dtype=np.uint64)
+        entries["url_length"] = np.frombuffer(self._url_lengths, dtype=np.uint32)
+        entries["body_length"] = np.frombuffer(self._body_lengths, dtype=np.uint32)
+        entries["score"] = np.frombuffer(self._scores, dtype=np.float32)
+        f.write(entries.tobytes())
+
+        lookup_offset = f.tell()
+        lookup = np.zeros(count, dtype=LOOKUP_DTYPE)
+        lookup["hash"] = np.frombuffer(self._hashes, dtype=np.uint64)
+        lookup["entry"] = np.arange(count, dtype=np.uint64)
+        lookup.sort(order=["hash", "entry"])
+        f.write(lookup.tobytes())
+
+        metadata = dict(self.metadata, pages=count, created=self.metadata.get("created") or datetime.now().isoformat())
+        meta_bytes = json.dumps(metadata).encode('utf-8')
+        metadata_offset = f.tell()
+        f.write(meta_bytes)
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, count, entries_offset, lookup_offset, metadata_offset, len(meta_bytes)))
+        f.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        try:
+            self._file.close()
+            os.remove(self._tmp_path)
+        except:
+            pass
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class CorpusReader:
+    """Memory-mapped, read-only view of a .corpus file.
+
+    Pages are addressed by URL or by position in export order. `body()`
+    returns a zero-copy memoryview into the mapping; text is only decoded
+    by `[]`/`get()`/iteration. Readers are cheap to open, so each worker
+    of a parallel job opens its own and walks one of `shards()`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, entries_offset, lookup_offset, metadata_offset, metadata_length = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a corpus file")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"{path} uses corpus format {version}; this reader supports up to {VERSION}")
+        self._count = count
+        self.entries = np.frombuffer(self._map, dtype=ENTRY_DTYPE, count=count, offset=entries_offset)
+        self._lookup = np.frombuffer(self._map, dtype=LOOKUP_DTYPE, count=count, offset=lookup_offset)
+        self.metadata: Dict[str, Any] = json.loads(self._map[metadata_offset:metadata_offset + metadata_length])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, url: str) -> Optional[int]:
+        key = np.uint64(url_hash(url))
+        position = int(np.searchsorted(self._lookup["hash"], key))
+        wanted = canonical_url(url)
+        while position < self._count and self._lookup["hash"][position] == key:
+            entry = int(self._lookup["entry"][position])
+            if canonical_url(self.url(entry)) == wanted:
+                return entry
+            position += 1
+        return None
+
+    def url(self, index: int) -> str:
+        offset, url_length = int(self.entries["offset"][index]), int(self.entries["url_length"][index])
+        return self._map[offset:offset + url_length].decode('utf-8')
+
+    def body(self, index: int) -> memoryview:
+        """UTF-8 bytes of a page, straight from the mapping"""
+        entry = self.entries[index]
+        start = int(entry["offset"]) + int(entry["url_length"])
+        return memoryview(self._map)[start:start + int(entry["body_length"])]
+
+    def text(self, index: int) -> str:
+        return str(self.body(index), 'utf-8')
+
+    def score(self, index: int) -> Optional[float]:
+        score = float(self.entries["score"][index])
+        return None if score != score else score
+
+    def get(self, url: str, default: Optional[str] = None) -> Optional[str]:
+        entry = self._entry(url)
+        return default if entry is None else self.text(entry)
+
+    def __getitem__(self, url: str) -> str:
+        entry = self._entry(url)
+        if entry is None:
+            raise KeyError(url)
+        return self.text(entry)
+
+    def __contains__(self, url) -> bool:
+        return isinstance(url, str) and self._entry(url) is not None
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """(url, text) for pages [start, stop) in export order, read sequentially"""
+        stop = self._count if stop is None else min(stop, self._count)
+        for index in range(start, stop):
+            yield self.url(index), self.text(index)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return self.iter_range()
+
+    def shards(self, count: int) -> List[Tuple[int, int]]:
+        """Split the pages into `count` contiguous (start, stop) ranges of similar byte size"""
+        if not self._count:
+            return []
+        sizes = self.entries["url_length"].astype(np.int64) + self.entries["body_length"]
+        ends = np.cumsum(sizes)
+        targets = ends[-1] * np.arange(1, count) / count
+        cuts = np.searchsorted(ends, targets, side="right").tolist()
+        bounds = [0] + cuts + [self._count]
+        return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+    def close(self):
+        # Views into the mapping must go before it can be closed
+        self.entries = self._lookup = None
+        try:
+            self._map.close()
+        except:
+            pass
+        try:
+            self._file.close()
+        except:
+            pass
+
+    def __enter__(self) -> "CorpusReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
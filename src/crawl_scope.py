@@ -0,0 +1,167 @@
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Mapping, Optional, Pattern
+from urllib.parse import urlparse
+
+SITEMAP_NS = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+
+ORDER_DOCUMENT = "document"
+ORDER_PRIORITY = "priority"
+ORDER_LASTMOD = "lastmod"
+ORDER_DEPTH = "depth"
+ORDER_IMPORTANCE = "importance"  # Link-graph PageRank from earlier crawls of the site
+
+@dataclass
+class SitemapEntry:
+    url: str
+    priority: float = 0.5
+    lastmod: Optional[datetime] = None
+    position: int = 0
+
+    @property
+    def depth(self) -> int:
+        return len([part for part in urlparse(self.url).path.split('/') if part])
+
+def _parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    value = value.strip().replace('Z', '+00:00')
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    return parsed.replace(tzinfo=None)
+
+def parse_sitemap_entries(root) -> List[SitemapEntry]:
+    """Read <url> entries with their priority and lastmod from a parsed sitemap.
+
+    Sitemap indexes have <sitemap> instead of <url> children; for those (and
+    anything else without <url> elements) every <loc> becomes a bare entry.
+    """
+    entries = []
+    for position, node in enumerate(root.findall('.//ns:url', SITEMAP_NS)):
+        loc = node.findtext('ns:loc', namespaces=SITEMAP_NS)
+        if not loc:
+            continue
+        priority = node.findtext('ns:priority', namespaces=SITEMAP_NS)
+        try:
+            priority = float(priority) if priority else 0.5
+        except ValueError:
+            priority = 0.5
+        entries.append(SitemapEntry(
+            url=loc.strip(),
+            priority=priority,
+            lastmod=_parse_lastmod(node.findtext('ns:lastmod', namespaces=SITEMAP_NS)),
+            position=position
+        ))
+    if not entries:
+        entries = [SitemapEntry(url=loc.text.strip(), position=position)
+                   for position, loc in enumerate(root.findall('.//ns:loc', SITEMAP_NS))
+                   if loc.text]
+    return entries
+
+def compile_patterns(patterns: List[str]) -> Optional[Pattern]:
+    """Compile URL patterns into a single alternation regex.
+
+    A pattern with glob characters (`*`, `?`) is translated to a regex;
+    anything else matches as a plain substring, so "/tag/" just works.
+    A pattern prefixed with "re:" is used as a raw regular expression.
+    """
+    parts = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if pattern.startswith("re:"):
+            parts.append(pattern[3:])
+        elif '*' in pattern or '?' in pattern:
+            parts.append('.*'.join('.'.join(re.escape(piece) for piece in chunk.split('?'))
+                                   for chunk in pattern.split('*')))
+        else:
+            parts.append(re.escape(pattern))
+    if not parts:
+        return None
+    return re.compile('|'.join(f'(?:{part})' for part in parts), re.IGNORECASE)
+
+@dataclass
+class CrawlScope:
+    """Which sitemap URLs to crawl, in what order, and when to stop"""
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    order: str = ORDER_DOCUMENT
+    max_pages: int = 0       # 0 means unlimited
+    max_bytes: int = 0
+    max_seconds: float = 0
+
+    def __post_init__(self):
+        self._include = compile_patterns(self.include)
+        self._exclude = compile_patterns(self.exclude)
+
+    def allows(self, url: str) -> bool:
+        if self._exclude and self._exclude.search(url):
+            return False
+        if self._include and not self._include.search(url):
+            return False
+        return True
+
+    def select(self, entries: List[SitemapEntry], scores: Optional[Mapping[str, float]] = None) -> List[str]:
+        """Filter, de-duplicate and order sitemap entries.
+
+        Importance ordering uses `scores` (url -> importance); pages without
+        a score go last, shallowest first.
+        """
+        seen = set()
+        kept = []
+        for entry in entries:
+            if entry.url in seen or not self.allows(entry.url):
+                continue
+            seen.add(entry.url)
+            kept.append(entry)
+
+        if self.order == ORDER_PRIORITY:
+            kept.sort(key=lambda e: (-e.priority, e.position))
+        elif self.order == ORDER_LASTMOD:
+            kept.sort(key=lambda e: (e.lastmod is None, -(e.lastmod.timestamp() if e.lastmod else 0), e.position))
+        elif self.order == ORDER_DEPTH:
+            kept.sort(key=lambda e: (e.depth, e.position))
+        elif self.order == ORDER_IMPORTANCE:
+            scores = scores or {}
+            kept.sort(key=lambda e: (-scores.get(e.url, 0.0), e.depth, e.position))
+        return [entry.url for entry in kept]
+
+    def budget(self) -> "CrawlBudget":
+        return CrawlBudget(self.max_pages, self.max_bytes, self.max_seconds)
+
+class CrawlBudget:
+    """Tracks pages, bytes and time spent against hard limits"""
+
+    def __init__(self, max_pages: int = 0, max_bytes: int = 0, max_seconds: float = 0):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.pages = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+    def record(self, markdown: str):
+        self.pages += 1
+        self.bytes += len(markdown.encode('utf-8'))
+
+    def remaining_pages(self) -> Optional[int]:
+        if not self.max_pages:
+            return None
+        return max(0, self.max_pages - self.pages)
+
+    def exhausted_reason(self) -> Optional[str]:
+        if self.max_pages and self.pages >= self.max_pages:
+            return f"page budget of {self.max_pages} reached"
+        if self.max_bytes and self.bytes >= self.max_bytes:
+            return f"size budget of {self.max_bytes / (1024 * 1024):.1f} MB reached"
+        if self.max_seconds and time.monotonic() - self.started >= self.max_seconds:
+            return f"time budget of {self.max_seconds:.0f}s reached"
+        return None
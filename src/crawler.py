@@ -1,44 +1,412 @@
 import asyncio
+import contextlib
+import logging
+import time
 import psutil
 import os
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple, Mapping, MutableMapping, AsyncGenerator, Awaitable
 from dataclasses import dataclass
 from datetime import datetime
 import requests
 from xml.etree import ElementTree
+from urllib.parse import urlparse
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+from src.blocking import ResourceBlockProfile, BlockStats
+from src.retry import RetryPolicy, RetryQueue
+from src.page_cache import PageCache, PageCacheMode, CacheStats
+from src.search_index import SearchIndex
+from src.crawl_scope import CrawlScope, CrawlBudget, parse_sitemap_entries, ORDER_IMPORTANCE
+from src.page_store import PageStore
+from src.triage import ContentTriage, ROUTE_SKIP, ROUTE_DIRECT
+from src.extraction import ExtractionProfiles, DomainProfile
+from src.log_config import get_logger, SAMPLED
+from src.warc import WarcWriter
+from src.link_graph import LinkGraph, LinkScores
+from src.url_list import UrlListSource
+from src.autotune import ConcurrencyTuner
+from src.readiness import ReadinessProfiles, ReadinessStats
+from src.corpus import CorpusWriter, CORPUS_SUFFIX
 
 # Set Playwright browser path
 os.environ["PLAYWRIGHT_BROWSERS_PATH"] = os.path.expanduser("~/Library/Caches/ms-playwright")
 
+logger = get_logger("crawler")
+
+# URLs read from a list file per step; each chunk is crawled in the usual batches
+URL_LIST_CHUNK_SIZE = 500
+# Link graphs of URL-list runs are saved under this name instead of a host
+URL_LIST_GRAPH_HOST = "url-lists"
+
 @dataclass
 class CrawlProgress:
     status: str
     memory_usage: float
     pages_crawled: int = 0
     total_pages: int = 0
+    queued_pages: int = 0  # URLs found, less skipped ones; total_pages is this capped by the page budget
     time_elapsed: float = 0
     is_complete: bool = False
     error: Optional[str] = None
+    failed_pages: int = 0
+
+@dataclass
+class PageResult:
+    url: str
+    status: str  # "ok", "skipped", "retrying" or "failed"
+    latency: float = 0.0
+    size: int = 0
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+@dataclass
+class CrawledPage:
+    """A page yielded by iter_sitemap / iter_url_list"""
+    url: str
+    markdown: str
+    status_code: Optional[int] = None
+    latency: float = 0.0
+
+class PageSink(MutableMapping):
+    """Results mapping for streamed runs: hands pages to a stream's queue instead of keeping them.
+
+    `_crawl_batches` puts each finished page on `queue` (waiting while it is
+    full); the mapping itself only counts. The run's progress is kept so the
+    stream can raise the error of a failed crawl.
+    """
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self.progress: Optional[CrawlProgress] = None
+        self._count = 0
+
+    def __setitem__(self, url: str, markdown: str):
+        self._count += 1
+
+    def __getitem__(self, url: str) -> str:
+        raise KeyError(url)
+
+    def __delitem__(self, url: str):
+        raise KeyError(url)
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self) -> int:
+        return self._count
+
+class PageIterator:
+    """Async iterator over a streamed crawl; as a context manager it stops the crawl on exit.
+
+        async with crawler.iter_sitemap(url) as pages:
+            async for page in pages:
+                ...
+
+    A bare `async for` works too, but then the crawl is only stopped once
+    the abandoned iterator is garbage collected.
+    """
+
+    def __init__(self, pages: AsyncGenerator[CrawledPage, None]):
+        self._pages = pages
+
+    def __aiter__(self) -> "PageIterator":
+        return self
+
+    async def __anext__(self) -> CrawledPage:
+        return await self._pages.__anext__()
+
+    async def aclose(self):
+        await self._pages.aclose()
+
+    async def __aenter__(self) -> "PageIterator":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
 
 class WebCrawler:
-    def __init__(self, progress_callback: Callable[[CrawlProgress], None]):
-        print("Initializing WebCrawler...")
+    def __init__(self, progress_callback: Callable[[CrawlProgress], None],
+                 block_profile: Optional[ResourceBlockProfile] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 page_cache: Optional[PageCache] = None,
+                 search_index: Optional[SearchIndex] = None,
+                 triage: Optional[ContentTriage] = None,
+                 extraction_profiles: Optional[ExtractionProfiles] = None,
+                 readiness: Optional[ReadinessProfiles] = None,
+                 warc_writer: Optional[WarcWriter] = None,
+                 link_graph_dir: Optional[str] = None,
+                 browser_pool=None, scheduler=None, job_id: Optional[str] = None,
+                 page_callback: Optional[Callable[[PageResult], None]] = None):
+        logger.debug("Initializing WebCrawler")
         self.progress_callback = progress_callback
+        self.page_callback = page_callback  # Called once per finished page attempt
+        # crawl4ai logs every fetch itself; only let it when we are debugging
         self.browser_config = BrowserConfig(
             headless=True,
-            verbose=True
+            verbose=logger.isEnabledFor(logging.DEBUG)
         )
+        self.block_profile = block_profile
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.failed_urls: Dict[str, str] = {}  # Final per-URL failure reasons
+        self.page_cache = page_cache
+        self.cache_mode = PageCacheMode.READ_THROUGH if page_cache else PageCacheMode.BYPASS
+        self.search_index = search_index
+        self.triage = triage
+        self.extraction_profiles = extraction_profiles
+        self.readiness = readiness  # Per-domain choice of how long to wait before taking the DOM
+        self.warc_writer = warc_writer  # Archives rendered HTML for offline re-extraction
+        self.link_graph_dir = link_graph_dir  # Where per-run link graphs are saved; None disables capture
+        self.link_graph: Optional[LinkGraph] = None  # Internal links of the current/last run
+        # (min, max) pages in flight for the autotuner; None keeps max_concurrent fixed
+        self.autotune_bounds: Optional[Tuple[int, int]] = None
+        self.tuner: Optional[ConcurrencyTuner] = None
+        # Set when running inside a JobQueue: browsers and page slots are shared
+        self.browser_pool = browser_pool
+        self.scheduler = scheduler
+        self.job_id = job_id
+        # This crawl's own counters; the profiles and cache above may be shared with other jobs
+        self.block_stats = BlockStats()
+        self.cache_stats = CacheStats()
+        self.readiness_stats = ReadinessStats()
         self.start_time = None
         self.process = psutil.Process(os.getpid())
         self.crawled_content = {}  # Store crawled content
 
+    def _create_crawler(self) -> AsyncWebCrawler:
+        """Create a browser-backed crawler with the configured blocking profile"""
+        crawler = AsyncWebCrawler(config=self.browser_config)
+        if self.block_profile:
+            self.block_profile.attach(crawler)
+        return crawler
+
+    async def _open_crawler(self) -> AsyncWebCrawler:
+        """Start a crawler, or borrow one from the shared browser pool"""
+        if self.browser_pool:
+            return await self.browser_pool.acquire()
+        crawler = self._create_crawler()
+        await crawler.start()
+        return crawler
+
+    async def _close_crawler(self, crawler: Optional[AsyncWebCrawler], broken: bool = False):
+        if crawler is None:
+            return
+        if self.browser_pool:
+            self.browser_pool.release(crawler)
+            if broken:
+                await self.browser_pool.discard(crawler)
+            return
+        try:
+            await crawler.close()
+        except:
+            pass
+
+    def _report_page(self, url: str, markdown: str, error: Optional[str],
+                     status_code: Optional[int], latency: float, retry_queue: RetryQueue):
+        if not self.page_callback:
+            return
+        if markdown:
+            status = "ok"
+        elif self.triage and url in self.triage.skipped:
+            status = "skipped"
+            error = self.triage.skipped[url]
+        elif url in retry_queue.pending:
+            status = "retrying"
+        else:
+            status = "failed"
+        try:
+            self.page_callback(PageResult(
+                url=url, status=status, latency=latency,
+                size=len(markdown.encode('utf-8')) if markdown else 0,
+                error=error, status_code=status_code
+            ))
+        except Exception as e:
+            logger.error("Error in page callback: %s", e)
+
+    async def _index_page(self, url: str, markdown: str):
+        """Add a finished page to the full-text index, if one is configured"""
+        if self.search_index:
+            try:
+                # Indexing writes to SQLite and commits every few pages; keep it off the event loop
+                await asyncio.to_thread(self.search_index.add, url, markdown, self.job_id)
+            except Exception as e:
+                logger.error("Error indexing %s: %s", url, e)
+
+    async def _flush_index(self):
+        if self.search_index:
+            await asyncio.to_thread(self.search_index.flush)
+
+    def _start_link_graph(self, host: str) -> Optional[LinkGraph]:
+        """Continue from the host's last saved graph, so cached pages keep their links"""
+        if not self.link_graph_dir:
+            return None
+        return LinkGraph.latest(self.link_graph_dir, host) or LinkGraph()
+
+    async def _save_link_graph(self, host: str):
+        if self.link_graph is None or not self.link_graph.page_count:
+            return
+        run_name = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if self.job_id:
+            run_name += f"_{self.job_id}"
+        try:
+            await asyncio.to_thread(self.link_graph.save, LinkGraph.path_for(self.link_graph_dir, host, run_name))
+        except Exception as e:
+            logger.error("Error saving link graph: %s", e)
+
+    def page_scores(self) -> Optional[LinkScores]:
+        """Importance of each page from the last sitemap or URL-list run's link graph"""
+        if self.link_graph is None or not self.link_graph.page_count:
+            return None
+        return self.link_graph.scores()
+
+    def _page_slot(self):
+        """Concurrency slot for one page fetch; a no-op outside a JobQueue"""
+        if self.scheduler:
+            return self.scheduler.slot(self.job_id)
+        return contextlib.nullcontext()
+
+    def _block_tracking(self, url: str):
+        """Count the page's blocked/loaded requests into this crawl's block_stats"""
+        if self.block_profile:
+            return self.block_profile.track(url, self.block_stats)
+        return contextlib.nullcontext()
+
+    def _run_config(self, profile: Optional[DomainProfile] = None,
+                    wait: Optional[Dict[str, Any]] = None) -> CrawlerRunConfig:
+        """Per-page run configuration shared by all crawl modes.
+
+        A domain profile scopes the DOM to the main content and drops site
+        chrome before crawl4ai generates markdown from it; `wait` holds the
+        readiness options (wait_until, wait_for) for the page's domain.
+        """
+        options = dict(wait or {})
+        if profile:
+            options.update(css_selector=profile.css_selector, excluded_selector=profile.excluded_selector)
+        return CrawlerRunConfig(cache_mode=CacheMode.BYPASS, verbose=logger.isEnabledFor(logging.DEBUG), **options)
+
+    def _reset_run_stats(self, max_concurrent: Optional[int] = None):
+        self.tuner = None
+        if self.autotune_bounds and max_concurrent:
+            self.tuner = ConcurrencyTuner(max_concurrent, *self.autotune_bounds)
+        self.block_stats = BlockStats()
+        self.cache_stats = CacheStats()
+        self.readiness_stats = ReadinessStats()
+        if self.triage:
+            self.triage.reset_stats()
+
+    def _with_run_summary(self, status: str) -> str:
+        details = []
+        if self.block_profile and self.block_profile.enabled:
+            details.append(self.block_stats.summary())
+        if self.page_cache and self.cache_mode != PageCacheMode.BYPASS:
+            details.append(self.cache_stats.summary())
+        if self.triage and (self.triage.skipped or self.triage.direct_count):
+            details.append(self.triage.summary())
+        if self.readiness and self.readiness.enabled:
+            details.append(self.readiness_stats.summary())
+        if self.tuner:
+            details.append(self.tuner.summary())
+        if details:
+            return f"{status} ({'; '.join(details)})"
+        return status
+
+    async def _fetch_page(self, crawler: AsyncWebCrawler, url: str,
+                          use_triage: bool = False) -> Tuple[str, Optional[str], Optional[int]]:
+        """Fetch one page, returning (markdown, error, status_code).
+
+        With `use_triage`, non-HTML URLs never reach the browser: binaries are
+        recorded in `triage.skipped` and text/XML is fetched directly.
+        """
+        use_cache = self.page_cache is not None and self.cache_mode != PageCacheMode.BYPASS
+        if use_cache and self.cache_mode == PageCacheMode.READ_THROUGH:
+            cached = await asyncio.to_thread(self.page_cache.get, url)
+            html = None
+            if cached and self.warc_writer:
+                # A page cached without its HTML has nothing to archive; render it again instead
+                html = await asyncio.to_thread(self.page_cache.get_html, url)
+            if not cached or (self.warc_writer and not html):
+                self.cache_stats.misses += 1
+            else:
+                self.cache_stats.hits += 1
+                if self.warc_writer:
+                    await asyncio.to_thread(self.warc_writer.write_response, url, html)
+                return cached, None, 200
+
+        if use_triage and self.triage:
+            route, detail = await self.triage.route(url)
+            if route == ROUTE_SKIP:
+                self.triage.skipped[url] = detail
+                return "", None, None
+            if route == ROUTE_DIRECT:
+                text, error, status_code = await self.triage.fetch_text(url, self.retry_policy.page_timeout)
+                if text and use_cache:
+                    await asyncio.to_thread(self.page_cache.put, url, text)
+                    self.cache_stats.writes += 1
+                return text, error or (None if text else "Empty response"), status_code
+
+        profile = self.extraction_profiles.for_url(url) if self.extraction_profiles else None
+        readiness = self.readiness if self.readiness and self.readiness.enabled else None
+        timing = readiness.for_url(url) if readiness else None
+        wait = readiness.wait_options(timing) if readiness else None
+        try:
+            async with self._page_slot(), self._block_tracking(url):
+                result = await asyncio.wait_for(
+                    crawler.arun(url=url, config=self._run_config(profile, wait)),
+                    timeout=self.retry_policy.page_timeout
+                )
+                if profile and result and result.success and not result.markdown:
+                    # The profile's selectors matched nothing on this page; take it whole
+                    await asyncio.to_thread(self.extraction_profiles.record_miss, url)
+                    result = await asyncio.wait_for(
+                        crawler.arun(url=url, config=self._run_config(wait=wait)),
+                        timeout=self.retry_policy.page_timeout
+                    )
+                    profile = None
+                if readiness and result and result.success and readiness.is_short(timing, result.markdown, profile is not None):
+                    # Taken at DOM ready the page had little text; give its scripts time to render
+                    await asyncio.to_thread(readiness.record_miss, url, self.readiness_stats)
+                    rendered = await asyncio.wait_for(
+                        crawler.arun(url=url, config=self._run_config(profile, readiness.wait_options(None))),
+                        timeout=self.retry_policy.page_timeout
+                    )
+                    if rendered and rendered.success and len(rendered.markdown or "") > len(result.markdown or ""):
+                        result = rendered
+                elif readiness and timing:
+                    readiness.record_hit(url)
+        except asyncio.TimeoutError:
+            return "", f"Timed out after {self.retry_policy.page_timeout:.0f}s", None
+        except Exception as e:
+            return "", str(e), None
+
+        if result and result.success and result.markdown:
+            html = result.html
+            if readiness:
+                # Learning a profile rewrites the JSON file; keep it off the event loop
+                html = await asyncio.to_thread(readiness.observe, url, html, result.markdown,
+                                               self.readiness_stats, profile is not None)
+            if profile:
+                self.extraction_profiles.record_hit(url)
+            elif self.extraction_profiles and self.extraction_profiles.enabled:
+                # Layout sampling parses the HTML; keep it off the event loop
+                await asyncio.to_thread(self.extraction_profiles.observe, url, html)
+            if use_cache:
+                await asyncio.to_thread(self.page_cache.put, url, result.markdown, html)
+                self.cache_stats.writes += 1
+            if self.link_graph is not None and result.links:
+                self.link_graph.add_page(url, [link.get("href") for link in result.links.get("internal", [])])
+            if self.warc_writer and html:
+                await asyncio.to_thread(self.warc_writer.write_response, url, html,
+                                        result.status_code, result.response_headers)
+            return result.markdown, None, result.status_code
+        error = (result.error_message if result else None) or "No content retrieved"
+        return "", error, result.status_code if result else None
+
     async def crawl_single_page(self, url: str) -> str:
         """Crawl a single page with better error handling and retries"""
-        print(f"Starting single page crawl for: {url}")
+        logger.info("Starting single page crawl for: %s", url)
         self.start_time = datetime.now()
-        max_retries = 3
-        retry_count = 0
+        self._reset_run_stats()
+        self.failed_urls = {}
+        max_retries = self.retry_policy.max_attempts
+        retry_queue = RetryQueue(self.retry_policy)
 
         progress = CrawlProgress(
             status="Initializing crawler...",
@@ -48,54 +416,49 @@ class WebCrawler:
         )
         self.progress_callback(progress)
 
-        while retry_count < max_retries:
-            crawler = None
-            try:
-                crawler = AsyncWebCrawler(config=self.browser_config)
-                await crawler.start()
+        crawler = None
+        try:
+            for attempt in range(1, max_retries + 1):
+                if crawler is None:
+                    crawler = await self._open_crawler()
 
-                progress.status = f"Crawling page... (Attempt {retry_count + 1}/{max_retries})"
+                progress.status = f"Crawling page... (Attempt {attempt}/{max_retries})"
                 self.progress_callback(progress)
 
-                result = await asyncio.wait_for(
-                    crawler.arun(
-                        url=url,
-                        config=CrawlerRunConfig(
-                            cache_mode=CacheMode.BYPASS
-                        )
-                    ),
-                    timeout=60
-                )
-
-                if result and result.markdown:
-                    progress.status = "Crawling completed successfully!"
+                started = time.monotonic()
+                markdown, error, status_code = await self._fetch_page(crawler, url)
+                latency = time.monotonic() - started
+                if markdown:
+                    self._report_page(url, markdown, None, status_code, latency, retry_queue)
+                    progress.status = self._with_run_summary("Crawling completed successfully!")
                     progress.pages_crawled = 1
                     progress.is_complete = True
-                    self.crawled_content = {"result": result.markdown}  # Store content
+                    progress.error = None
+                    self.crawled_content = {"result": markdown}  # Store content
+                    await self._index_page(url, markdown)
+                    await self._flush_index()
                     self.progress_callback(progress)
-                    return result.markdown
+                    return markdown
 
-                progress.error = "Failed to retrieve content"
+                logger.warning("Error during crawl (attempt %d): %s", attempt, error)
+                retry_queue.record_failure(url, error, status_code)
+                self._report_page(url, "", error, status_code, latency, retry_queue)
+                progress.error = f"Error: {error}"
                 self.progress_callback(progress)
-                retry_count += 1
+                if url not in retry_queue.pending:
+                    break
 
-            except Exception as e:
-                print(f"Error during crawl (attempt {retry_count + 1}): {e}")
-                retry_count += 1
-                progress.error = f"Error: {str(e)}"
-                self.progress_callback(progress)
-
-            finally:
-                if crawler:
-                    try:
-                        await crawler.close()
-                    except:
-                        pass
-
-            if retry_count < max_retries:
-                await asyncio.sleep(2)
+                # A browser-level failure leaves the crawler unusable; restart it
+                if "closed" in error.lower():
+                    await self._close_crawler(crawler, broken=True)
+                    crawler = None
+                await asyncio.sleep(self.retry_policy.backoff_delay(attempt))
+        finally:
+            await self._close_crawler(crawler)
 
+        self.failed_urls = retry_queue.report()
         progress.status = "Crawling failed after all attempts"
+        progress.failed_pages = 1
         progress.is_complete = True
         self.progress_callback(progress)
         return ""
@@ -105,14 +468,12 @@ class WebCrawler:
         try:
             return self.process.memory_info().rss / (1024 * 1024)
         except Exception as e:
-            print(f"Error getting memory usage: {e}")
+            logger.error("Error getting memory usage: %s", e)
             return 0.0
 
-    async def crawl_sitemap(self, sitemap_url: str, max_concurrent: int = 3) -> Dict[str, str]:
-        """Crawl sitemap with improved stability and error handling"""
-        print(f"Starting sitemap crawl for: {sitemap_url}")
-        self.start_time = datetime.now()
-        
+    def discover_sitemap_urls(self, sitemap_url: str, scope: Optional[CrawlScope] = None,
+                              scores: Optional[Mapping[str, float]] = None) -> Tuple[bool, List[str]]:
+        """Find the sitemap (trying common locations) and return the in-scope URLs"""
         # First, try common sitemap locations if the provided URL fails
         sitemap_urls_to_try = [
             sitemap_url,
@@ -121,31 +482,48 @@ class WebCrawler:
             sitemap_url.replace('/sitemap.xml', '/sitemap/sitemap.xml')
         ]
         
-        urls = []
-        sitemap_found = False
-        results = {}  # Initialize results dictionary
-        
         for try_url in sitemap_urls_to_try:
             try:
-                print(f"Trying sitemap at: {try_url}")
+                logger.debug("Trying sitemap at: %s", try_url)
                 response = requests.get(try_url, timeout=30)
                 
                 if response.status_code == 200:
                     try:
                         root = ElementTree.fromstring(response.content)
-                        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-                        found_urls = [loc.text for loc in root.findall('.//ns:loc', namespace)]
+                        entries = parse_sitemap_entries(root)
                         
-                        if found_urls:
-                            urls = found_urls
-                            sitemap_found = True
-                            print(f"Found valid sitemap at {try_url} with {len(urls)} URLs")
-                            break
+                        if entries:
+                            urls = (scope or CrawlScope()).select(entries, scores)
+                            logger.info("Found valid sitemap at %s with %d URLs, %d in scope",
+                                        try_url, len(entries), len(urls))
+                            return True, urls
                     except ElementTree.ParseError:
                         continue
                         
             except requests.exceptions.RequestException:
                 continue
+        return False, []
+
+    async def crawl_sitemap(self, sitemap_url: str, max_concurrent: int = 3,
+                            scope: Optional[CrawlScope] = None,
+                            results: Optional[MutableMapping[str, str]] = None) -> Mapping[str, str]:
+        """Crawl sitemap with improved stability and error handling.
+
+        `scope` filters and orders the sitemap URLs and sets page/byte/time
+        budgets; without one every URL is crawled in document order. Pages
+        go into `results` (a compressed PageStore by default).
+        """
+        logger.info("Starting sitemap crawl for: %s", sitemap_url)
+        self.start_time = datetime.now()
+        self._reset_run_stats(max_concurrent)
+        self.failed_urls = {}
+        
+        results = PageStore() if results is None else results  # Compressed url -> markdown results
+        host = urlparse(sitemap_url).hostname or "unknown"
+        self.link_graph = self._start_link_graph(host)
+        by_importance = bool(scope and scope.order == ORDER_IMPORTANCE and self.link_graph is not None)
+        scores = self.link_graph.scores() if by_importance and self.link_graph.page_count else None
+        sitemap_found, urls = self.discover_sitemap_urls(sitemap_url, scope, scores)
 
         if not sitemap_found:
             # If no sitemap found, try to crawl just the base URL
@@ -159,23 +537,22 @@ class WebCrawler:
                 pages_crawled=0,
                 total_pages=1
             )
+            self._bind_progress(results, progress)
             self.progress_callback(progress)
             
+            crawler = None
             try:
-                crawler = AsyncWebCrawler(config=self.browser_config)
-                await crawler.start()
+                crawler = await self._open_crawler()
+                markdown, error, _ = await self._fetch_page(crawler, base_url)
                 
-                result = await crawler.arun(
-                    url=base_url,
-                    config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-                )
-                
-                if result.success and result.markdown:
+                if markdown:
+                    await self._index_page(base_url, markdown)
+                    await self._flush_index()
                     progress.status = "Successfully crawled as single page"
                     progress.pages_crawled = 1
                     progress.is_complete = True
                     self.progress_callback(progress)
-                    return {base_url: result.markdown}
+                    return {base_url: markdown}
                 else:
                     progress.status = "Failed to crawl page"
                     progress.error = "Could not retrieve content from the page"
@@ -188,97 +565,312 @@ class WebCrawler:
                 self.progress_callback(progress)
                 return {}
             finally:
-                if crawler:
-                    try:
-                        await crawler.close()
-                    except:
-                        pass
+                await self._close_crawler(crawler)
 
         # Continue with multi-page crawling if sitemap was found
+        budget = (scope or CrawlScope()).budget()
+        total_pages = len(urls)
+        if budget.max_pages:
+            total_pages = min(total_pages, budget.max_pages)
         progress = CrawlProgress(
             status=f"Found {len(urls)} URLs in sitemap",
             memory_usage=self.get_memory_usage(),
             pages_crawled=0,
-            total_pages=len(urls)
+            total_pages=total_pages,
+            queued_pages=len(urls)
         )
+        self._bind_progress(results, progress)
         self.progress_callback(progress)
 
+        retry_queue = RetryQueue(self.retry_policy)
+        self.crawled_content = results  # Live view of pages crawled so far
         crawler = None
         try:
-            crawler = AsyncWebCrawler(config=self.browser_config)
-            await crawler.start()
-
-            async def process_url(url: str):
-                try:
-                    print(f"Crawling: {url}")
-                    result = await crawler.arun(
-                        url=url,
-                        config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-                    )
-                    if result.success and result.markdown:
-                        print(f"Successfully crawled: {url}")
-                        return url, result.markdown
-                    print(f"No content retrieved from: {url}")
-                    return url, ""
-                except Exception as e:
-                    print(f"Error crawling {url}: {e}")
-                    return url, ""
-
-            # Process in smaller batches
-            batch_size = min(max_concurrent, 10)
-            for i in range(0, len(urls), batch_size):
-                print(f"\n=== Processing Batch {i//batch_size + 1} ===")
-                batch = urls[i:i + batch_size]
-                tasks = []
-                
-                for url in batch:
-                    task = asyncio.create_task(process_url(url))
-                    tasks.append(task)
+            crawler = await self._open_crawler()
 
-                print(f"Awaiting batch results...")
-                batch_results = await asyncio.gather(*tasks)
-                
-                # Update progress
-                successful_in_batch = 0
-                for url, content in batch_results:
-                    if content:
-                        results[url] = content
-                        successful_in_batch += 1
-                
-                progress.pages_crawled += successful_in_batch
-                print(f"Batch complete: {successful_in_batch} pages successful")
-                print(f"Total progress: {progress.pages_crawled}/{progress.total_pages}")
-                
-                progress.status = f"Crawling pages... ({progress.pages_crawled}/{progress.total_pages})"
-                self.progress_callback(progress)
-                
-                print(f"Completed batch {i//batch_size + 1}, Total: {len(results)}/{len(urls)} pages")
-                await asyncio.sleep(0.5)  # Small delay between batches
-            if not results:
-                progress.status = "No content could be retrieved"
-                progress.error = "Failed to retrieve content from any URLs"
-            else:
-                progress.status = f"Successfully crawled {len(results)} pages"
-                
-            progress.is_complete = True
+            await self._crawl_batches(crawler, urls, max_concurrent, progress, results, retry_queue, budget,
+                                      reprioritize=by_importance)
+            await self._finish_run(crawler, max_concurrent, progress, results, retry_queue, budget)
+            # After the retry rounds, so pages that only succeeded on retry keep their links
+            await self._save_link_graph(host)
+
+        except Exception as e:
+            logger.error("Error during sitemap crawl: %s", e, exc_info=True)
+            progress.error = str(e)
             self.progress_callback(progress)
+        finally:
+            await self._close_crawler(crawler)
+            if self.triage:
+                await self.triage.close()
+
+        return results
+
+    async def _finish_run(self, crawler: AsyncWebCrawler, max_concurrent: int, progress: CrawlProgress,
+                          results: MutableMapping[str, str], retry_queue: RetryQueue, budget: CrawlBudget):
+        """Run deferred retry rounds, then record failures and the final status"""
+        # Deferred retries run after the main pass so they never hold up healthy pages
+        retry_round = 1
+        while len(retry_queue) and not budget.exhausted_reason():
+            delay = self.retry_policy.backoff_delay(retry_round)
+            progress.status = f"Retrying {len(retry_queue)} failed pages in {delay:.1f}s..."
+            self.progress_callback(progress)
+            await asyncio.sleep(delay)
+            retry_urls = [failure.url for failure in retry_queue.next_round()]
+            await self._crawl_batches(crawler, retry_urls, max_concurrent, progress, results, retry_queue, budget)
+            retry_round += 1
+
+        budget_reason = budget.exhausted_reason()
+        if budget_reason:
+            logger.info("Stopped early: %s", budget_reason)
+            # URLs still waiting for a retry will not get one; report them rather than drop them
+            retry_queue.abandon_pending(f"budget exhausted ({budget_reason})")
+        if self.tuner:
+            logger.info("Autotuner: %s", self.tuner.summary())
+
+        await self._flush_index()
+        if self.warc_writer:
+            self.warc_writer.flush()
+        self.failed_urls = retry_queue.report()
+        progress.failed_pages = len(self.failed_urls)
+        for url, reason in self.failed_urls.items():
+            logger.warning("Failed: %s - %s", url, reason)
+
+        if not results:
+            progress.status = "No content could be retrieved"
+            progress.error = "Failed to retrieve content from any URLs"
+        else:
+            status = f"Successfully crawled {len(results)} pages"
+            if self.failed_urls:
+                status += f", {len(self.failed_urls)} failed"
+            if budget_reason:
+                status += f", stopped: {budget_reason}"
+            progress.status = self._with_run_summary(status)
+
+        progress.is_complete = True
+        self.progress_callback(progress)
+
+    async def crawl_url_list(self, source: UrlListSource, max_concurrent: int = 3,
+                             scope: Optional[CrawlScope] = None,
+                             results: Optional[MutableMapping[str, str]] = None) -> Mapping[str, str]:
+        """Crawl a pasted or file-supplied URL list through the same batched pipeline as sitemaps.
+
+        The list is streamed in chunks rather than loaded; `scope` patterns
+        and budgets apply, its ordering does not.
+        """
+        logger.info("Starting URL list crawl for: %s", source.describe())
+        self.start_time = datetime.now()
+        self._reset_run_stats(max_concurrent)
+        self.failed_urls = {}
+        # Lists can span many sites, so each run starts its own graph instead of continuing a host's
+        self.link_graph = LinkGraph() if self.link_graph_dir else None
+
+        results = PageStore() if results is None else results
+        scope = scope or CrawlScope()
+        budget = scope.budget()
+        progress = CrawlProgress(
+            status=f"Reading {source.describe()}...",
+            memory_usage=self.get_memory_usage(),
+        )
+        self._bind_progress(results, progress)
+        self.progress_callback(progress)
+
+        retry_queue = RetryQueue(self.retry_policy)
+        self.crawled_content = results  # Live view of pages crawled so far
+        crawler = None
+        try:
+            # A counting pass keeps only hashes, so the progress total is exact without holding the list
+            total = await asyncio.to_thread(source.count, scope.allows)
+            progress.queued_pages = total
+            progress.total_pages = min(total, budget.max_pages) if budget.max_pages else total
+            progress.status = f"Found {total} unique URLs in {source.describe()}"
+            self.progress_callback(progress)
+
+            crawler = await self._open_crawler()
+            chunks = source.chunks(URL_LIST_CHUNK_SIZE, scope.allows)
+            while not budget.exhausted_reason():
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                await self._crawl_batches(crawler, chunk, max_concurrent, progress, results, retry_queue, budget)
+            await self._finish_run(crawler, max_concurrent, progress, results, retry_queue, budget)
+            await self._save_link_graph(URL_LIST_GRAPH_HOST)
 
         except Exception as e:
-            print(f"Error during sitemap crawl: {e}")
+            logger.error("Error during URL list crawl: %s", e, exc_info=True)
             progress.error = str(e)
             self.progress_callback(progress)
         finally:
-            if crawler:
-                try:
-                    await crawler.close()
-                except:
-                    pass
+            await self._close_crawler(crawler)
+            if self.triage:
+                await self.triage.close()
 
         return results
 
+    def iter_sitemap(self, sitemap_url: str, max_concurrent: int = 3, scope: Optional[CrawlScope] = None,
+                     buffer: Optional[int] = None) -> PageIterator:
+        """Stream a sitemap crawl, yielding each page as soon as it is done.
+
+            async with crawler.iter_sitemap(url, max_concurrent=5) as pages:
+                async for page in pages:
+                    ingest(page.url, page.markdown)
+
+        Pages are not kept, so memory stays flat however large the site.
+        At most `buffer` pages (default `max_concurrent`) wait for the
+        consumer; beyond that crawling pauses until it catches up. Leaving
+        the `async with` block stops the crawl and closes the browser. A
+        crawl that fails outright raises once the pages it did get are
+        yielded; failed URLs are in `failed_urls` once the loop ends.
+        """
+        return PageIterator(self._stream(
+            lambda sink: self.crawl_sitemap(sitemap_url, max_concurrent, scope, sink), buffer or max_concurrent))
+
+    def iter_url_list(self, source: UrlListSource, max_concurrent: int = 3, scope: Optional[CrawlScope] = None,
+                      buffer: Optional[int] = None) -> PageIterator:
+        """Like iter_sitemap, for a pasted or file-supplied URL list"""
+        return PageIterator(self._stream(
+            lambda sink: self.crawl_url_list(source, max_concurrent, scope, sink), buffer or max_concurrent))
+
+    @staticmethod
+    def _bind_progress(results: MutableMapping[str, str], progress: CrawlProgress):
+        """Let a streamed run's iterator see the run's final error"""
+        if isinstance(results, PageSink):
+            results.progress = progress
+
+    async def _stream(self, run: Callable[[MutableMapping[str, str]], Awaitable[Mapping[str, str]]],
+                      buffer: int) -> AsyncGenerator[CrawledPage, None]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(buffer, 1))
+        finished = object()
+        sink = PageSink(queue)
+        errors: List[Exception] = []
+
+        async def produce():
+            try:
+                pages = await run(sink)
+                if pages is not sink:
+                    # No sitemap: the base URL was crawled on its own and returned directly
+                    for url, markdown in pages.items():
+                        await queue.put(CrawledPage(url, markdown))
+            except Exception as e:
+                errors.append(e)
+            await queue.put(finished)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                page = await queue.get()
+                if page is finished:
+                    break
+                yield page
+            if errors:
+                raise errors[0]
+            if sink.progress and sink.progress.error:
+                raise Exception(sink.progress.error)
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await producer
+
+    async def _crawl_batches(self, crawler: AsyncWebCrawler, urls: List[str], max_concurrent: int,
+                             progress: CrawlProgress, results: MutableMapping[str, str], retry_queue: RetryQueue,
+                             budget: Optional[CrawlBudget] = None, reprioritize: bool = False):
+        """Crawl URLs in concurrent batches, deferring failures to the retry queue.
+
+        Stops scheduling new batches as soon as the budget is exhausted. With
+        `reprioritize`, the URLs not yet crawled are re-ranked by PageRank
+        whenever the link graph has grown by a tenth since the last ranking.
+        When an autotuner is active it sizes every batch and is fed its results.
+        """
+        async def process_url(url: str):
+            logger.debug("Crawling: %s", url, extra=SAMPLED)
+            started = time.monotonic()
+            markdown, error, status_code = await self._fetch_page(crawler, url, use_triage=True)
+            if markdown:
+                logger.debug("Successfully crawled: %s", url, extra=SAMPLED)
+            elif self.triage and url in self.triage.skipped:
+                logger.info("Skipped non-HTML URL: %s (%s)", url, self.triage.skipped[url], extra=SAMPLED)
+            else:
+                logger.warning("Error crawling %s: %s", url, error)
+            latency = time.monotonic() - started
+            if markdown and isinstance(results, PageSink):
+                # Waits while the consumer is behind, which holds back the next batch
+                await results.queue.put(CrawledPage(url, markdown, status_code, latency))
+            return url, markdown, error, status_code, latency
+
+        # Process in smaller batches
+        batch_size = min(max_concurrent, 10)
+        position = 0
+        batch_number = 0
+        urls = list(urls)
+        next_ranking = 0
+        while position < len(urls):
+            if budget and budget.exhausted_reason():
+                break
+            if reprioritize and self.link_graph is not None and self.link_graph.page_count >= next_ranking:
+                urls[position:] = self.link_graph.rank_urls(urls[position:])
+                next_ranking = int(self.link_graph.page_count * 1.1) + 50
+            batch_number += 1
+            logger.debug("Processing batch %d", batch_number)
+            size = self.tuner.concurrency if self.tuner else batch_size
+            remaining = budget.remaining_pages() if budget else None
+            if remaining is not None:
+                size = min(size, remaining)
+            batch = urls[position:position + size]
+            position += len(batch)
+            tasks = []
+            
+            for url in batch:
+                task = asyncio.create_task(process_url(url))
+                tasks.append(task)
+
+            batch_started = time.monotonic()
+            batch_results = await asyncio.gather(*tasks)
+            batch_elapsed = time.monotonic() - batch_started
+
+            # Update progress
+            successful_in_batch = 0
+            skipped_in_batch = 0
+            failed_in_batch = 0
+            latencies = []
+            for url, content, error, status_code, latency in batch_results:
+                if content:
+                    results[url] = content
+                    await self._index_page(url, content)
+                    retry_queue.record_success(url)
+                    if budget:
+                        budget.record(content)
+                    successful_in_batch += 1
+                    latencies.append(latency)
+                elif self.triage and url in self.triage.skipped:
+                    skipped_in_batch += 1
+                else:
+                    retry_queue.record_failure(url, error, status_code)
+                    failed_in_batch += 1
+                    latencies.append(latency)
+                self._report_page(url, content, error, status_code, latency, retry_queue)
+            
+            if self.tuner:
+                self.tuner.observe_batch(len(batch_results) - skipped_in_batch, failed_in_batch,
+                                         latencies, batch_elapsed)
+            progress.pages_crawled += successful_in_batch
+            # Skipped non-HTML URLs will never be crawled, so drop them from the total; a
+            # budget-capped total only shrinks once too few URLs are left to reach the cap
+            if skipped_in_batch:
+                progress.queued_pages -= skipped_in_batch
+                progress.total_pages = progress.queued_pages
+                if budget and budget.max_pages:
+                    progress.total_pages = min(progress.total_pages, budget.max_pages)
+            logger.debug("Batch %d complete: %d pages successful, %d/%d total", batch_number,
+                         successful_in_batch, progress.pages_crawled, progress.total_pages)
+            
+            progress.status = f"Crawling pages... ({progress.pages_crawled}/{progress.total_pages})"
+            self.progress_callback(progress)
+
+            await asyncio.sleep(0.5)  # Small delay between batches
+
     def get_sitemap_urls(self, sitemap_url: str) -> List[str]:
         """Fetch URLs from sitemap with better error handling"""
-        print(f"Fetching sitemap from: {sitemap_url}")
+        logger.info("Fetching sitemap from: %s", sitemap_url)
         try:
             response = requests.get(sitemap_url, timeout=30)
             response.raise_for_status()
@@ -288,22 +880,22 @@ class WebCrawler:
             urls = [loc.text for loc in root.findall('.//ns:loc', namespace)]
             
             if not urls:
-                print("No URLs found in sitemap")
+                logger.warning("No URLs found in sitemap")
                 raise Exception("Sitemap is empty or has invalid format")
                 
-            print(f"Found {len(urls)} URLs in sitemap")
+            logger.info("Found %d URLs in sitemap", len(urls))
             return urls
         except requests.exceptions.Timeout:
-            print("Sitemap request timed out")
+            logger.error("Sitemap request timed out")
             raise Exception("Sitemap request timed out")
         except requests.exceptions.RequestException as e:
-            print(f"Failed to fetch sitemap: {e}")
+            logger.error("Failed to fetch sitemap: %s", e)
             raise
         except ElementTree.ParseError:
-            print("Invalid sitemap format")
+            logger.error("Invalid sitemap format")
             raise Exception("Invalid sitemap format - Not a valid XML file")
         except Exception as e:
-            print(f"Error fetching sitemap: {e}")
+            logger.error("Error fetching sitemap: %s", e)
             raise
 
     def clean_content_for_rag(self, content: str) -> str:
@@ -338,5 +930,68 @@ class WebCrawler:
                 f.write(content)
             return True
         except Exception as e:
-            print(f"Error exporting to file: {e}")
-            return False
\ No newline at end of file
+            logger.error("Error exporting to file: %s", e)
+            return False
+
+    def export_pages_to_txt(self, pages: Mapping[str, str], filepath: str, clean_for_rag: bool = True,
+                            scores: Optional[Mapping[str, float]] = None):
+        """Export crawled pages one at a time, without building the whole file in memory.
+
+        With `scores`, pages are written most important first and each gets
+        an "Importance:" line under its header.
+        """
+        try:
+            urls = pages.keys()
+            if scores is not None:
+                urls = sorted(urls, key=lambda url: -scores.get(url, 0.0))
+            with open(filepath, 'w', encoding='utf-8') as f:
+                separator = ""
+                for url in urls:
+                    page_content = pages[url]
+                    if clean_for_rag:
+                        page_content = self.clean_content_for_rag(page_content)
+                    header = f"=== {url} ===\n"
+                    if scores is not None:
+                        header += f"Importance: {scores.get(url, 0.0):.3f}\n"
+                    f.write(f"{separator}{header}\n{page_content}")
+                    separator = "\n\n"
+            return True
+        except Exception as e:
+            logger.error("Error exporting to file: %s", e)
+            return False
+
+    def export_pages_to_corpus(self, pages: Mapping[str, str], filepath: str, clean_for_rag: bool = True,
+                               scores: Optional[Mapping[str, float]] = None,
+                               metadata: Optional[Dict[str, Any]] = None):
+        """Export pages to an indexed .corpus file that CorpusReader can open by URL or by range.
+
+        With `scores`, pages are stored most important first and each keeps its score.
+        """
+        writer = None
+        try:
+            urls = pages.keys()
+            if scores is not None:
+                urls = sorted(urls, key=lambda url: -scores.get(url, 0.0))
+            metadata = dict(metadata or {}, clean_for_rag=clean_for_rag)
+            if self.start_time:
+                metadata.setdefault("crawled_at", self.start_time.isoformat())
+            writer = CorpusWriter(filepath, metadata)
+            for url in urls:
+                page_content = pages[url]
+                if clean_for_rag:
+                    page_content = self.clean_content_for_rag(page_content)
+                writer.add(url, page_content, scores.get(url) if scores is not None else None)
+            writer.close()
+            return True
+        except Exception as e:
+            logger.error("Error exporting to corpus: %s", e)
+            if writer:
+                writer.abort()
+            return False
+
+    def export_pages(self, pages: Mapping[str, str], filepath: str, clean_for_rag: bool = True,
+                     scores: Optional[Mapping[str, float]] = None):
+        """Export to a .corpus file or to text, by the file's extension"""
+        if filepath.endswith(CORPUS_SUFFIX):
+            return self.export_pages_to_corpus(pages, filepath, clean_for_rag, scores)
+        return self.export_pages_to_txt(pages, filepath, clean_for_rag, scores)
\ No newline at end of file
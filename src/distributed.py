@@ -0,0 +1,471 @@
+"""Coordinator/worker mode: several hosts crawl one job through a shared queue.
+
+The coordinator discovers the sitemap URLs and enqueues them. Workers lease
+batches of URLs, run them through WebCrawler's page pipeline (cache, triage,
+resource blocking, retry classification) and complete each lease with its
+result. A lease that is not renewed before it expires goes back to pending,
+so a crashed worker's URLs are picked up by the others. Completion only
+counts when the worker still holds the lease, so every URL is recorded
+exactly once even if a slow worker finishes after its lease was reclaimed.
+A URL that failed with a transient error is pending again, but is not
+leased until the retry policy's backoff for that attempt has passed.
+
+    python -m src.distributed coordinator --db /shared/crawl.db --job docs --sitemap https://example.com/sitemap.xml
+    python -m src.distributed worker --db /shared/crawl.db --job docs
+    python -m src.distributed export --db /shared/crawl.db --job docs --out docs.txt
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.crawler import WebCrawler, CrawlProgress
+from src.crawl_scope import CrawlScope
+from src.retry import TRANSIENT
+from src.log_config import get_logger, setup_logging
+
+STATE_PENDING = "pending"
+STATE_LEASED = "leased"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+logger = get_logger("distributed")
+
+@dataclass
+class Lease:
+    job_id: str
+    url: str
+    token: str
+    attempts: int
+
+class WorkQueueBackend(ABC):
+    """Shared work queue and result sink used by coordinator and workers"""
+
+    @abstractmethod
+    def enqueue(self, job_id: str, urls: List[str]) -> int:
+        """Add URLs to a job, ignoring ones already queued; returns the number added"""
+
+    @abstractmethod
+    def lease(self, job_id: str, worker_id: str, count: int, lease_seconds: float) -> List[Lease]:
+        """Reclaim expired leases, then lease up to `count` pending URLs"""
+
+    @abstractmethod
+    def renew(self, leases: List[Lease], lease_seconds: float) -> List[Lease]:
+        """Extend leases still held; returns the ones that were lost"""
+
+    @abstractmethod
+    def complete(self, lease: Lease, markdown: str) -> bool:
+        """Store a result if the lease is still held; False means it was reclaimed"""
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str, retry: bool, max_attempts: int, retry_delay: float = 0.0) -> bool:
+        """Release a lease for retry after `retry_delay` seconds (or mark it failed); False if it was reclaimed"""
+
+    @abstractmethod
+    def counts(self, job_id: str) -> Dict[str, int]:
+        """Number of URLs per state for a job"""
+
+    @abstractmethod
+    def results(self, job_id: str) -> Iterator[Tuple[str, str]]:
+        """Completed (url, markdown) pairs for a job"""
+
+    @abstractmethod
+    def failures(self, job_id: str) -> Dict[str, str]:
+        """Final failure reason per URL for a job"""
+
+    def is_finished(self, job_id: str) -> bool:
+        counts = self.counts(job_id)
+        return counts.get(STATE_PENDING, 0) == 0 and counts.get(STATE_LEASED, 0) == 0
+
+class InMemoryWorkQueue(WorkQueueBackend):
+    """Single-process stand-in with the same semantics, for local runs and tests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: Dict[Tuple[str, str], dict] = {}
+        self._results: Dict[Tuple[str, str], str] = {}
+
+    def enqueue(self, job_id, urls):
+        added = 0
+        with self._lock:
+            for url in urls:
+                if (job_id, url) not in self._tasks:
+                    self._tasks[(job_id, url)] = {"state": STATE_PENDING, "token": None,
+                                                  "expires": 0.0, "not_before": 0.0,
+                                                  "attempts": 0, "error": None}
+                    added += 1
+        return added
+
+    def lease(self, job_id, worker_id, count, lease_seconds):
+        now = time.time()
+        leases = []
+        with self._lock:
+            for (task_job, url), task in self._tasks.items():
+                if task_job != job_id:
+                    continue
+                if task["state"] == STATE_LEASED and task["expires"] < now:
+                    task["state"] = STATE_PENDING
+                if task["state"] == STATE_PENDING and task["not_before"] <= now and len(leases) < count:
+                    task.update(state=STATE_LEASED, token=uuid.uuid4().hex,
+                                expires=now + lease_seconds, attempts=task["attempts"] + 1)
+                    leases.append(Lease(job_id, url, task["token"], task["attempts"]))
+        return leases
+
+    def _held(self, lease):
+        task = self._tasks.get((lease.job_id, lease.url))
+        return task if task and task["state"] == STATE_LEASED and task["token"] == lease.token else None
+
+    def renew(self, leases, lease_seconds):
+        lost = []
+        with self._lock:
+            for lease in leases:
+                task = self._held(lease)
+                if task:
+                    task["expires"] = time.time() + lease_seconds
+                else:
+                    lost.append(lease)
+        return lost
+
+    def complete(self, lease, markdown):
+        with self._lock:
+            task = self._held(lease)
+            if not task:
+                return False
+            task.update(state=STATE_DONE, token=None)
+            self._results[(lease.job_id, lease.url)] = markdown
+            return True
+
+    def fail(self, lease, error, retry, max_attempts, retry_delay=0.0):
+        with self._lock:
+            task = self._held(lease)
+            if not task:
+                return False
+            state = STATE_PENDING if retry and task["attempts"] < max_attempts else STATE_FAILED
+            task.update(state=state, token=None, error=error, not_before=time.time() + retry_delay)
+            return True
+
+    def counts(self, job_id):
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for (task_job, _), task in self._tasks.items():
+                if task_job == job_id:
+                    counts[task["state"]] = counts.get(task["state"], 0) + 1
+        return counts
+
+    def results(self, job_id):
+        with self._lock:
+            items = [(url, markdown) for (task_job, url), markdown in self._results.items()
+                     if task_job == job_id]
+        return iter(items)
+
+    def failures(self, job_id):
+        with self._lock:
+            return {url: task["error"] for (task_job, url), task in self._tasks.items()
+                    if task_job == job_id and task["state"] == STATE_FAILED}
+
+class SQLiteWorkQueue(WorkQueueBackend):
+    """Work queue and result sink in one SQLite file on storage all hosts can reach.
+
+    Every state change happens in a BEGIN IMMEDIATE transaction, so leasing
+    and completion are atomic across processes. SQLite over network file
+    systems needs working POSIX locks (NFSv4, SMB with locking).
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=DELETE;
+            CREATE TABLE IF NOT EXISTS tasks (
+                job_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                worker TEXT,
+                token TEXT,
+                lease_expires REAL NOT NULL DEFAULT 0,
+                not_before REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                PRIMARY KEY (job_id, url)
+            );
+            CREATE INDEX IF NOT EXISTS tasks_state ON tasks(job_id, state, position);
+            CREATE TABLE IF NOT EXISTS results (
+                job_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                markdown TEXT NOT NULL,
+                worker TEXT,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (job_id, url)
+            );
+        """)
+        # Queues created before retries were delayed lack the not_before column
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(tasks)")}
+        if "not_before" not in columns:
+            self._db.execute("ALTER TABLE tasks ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+
+    def _transaction(self):
+        backend = self
+
+        class _Transaction:
+            def __enter__(self):
+                backend._lock.acquire()
+                backend._db.execute("BEGIN IMMEDIATE")
+                return backend._db
+
+            def __exit__(self, exc_type, exc, tb):
+                try:
+                    backend._db.execute("ROLLBACK" if exc_type else "COMMIT")
+                finally:
+                    backend._lock.release()
+
+        return _Transaction()
+
+    def enqueue(self, job_id, urls):
+        with self._transaction() as db:
+            start = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM tasks WHERE job_id = ?",
+                               (job_id,)).fetchone()[0]
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO tasks (job_id, url, position, state) VALUES (?, ?, ?, ?)",
+                [(job_id, url, start + i, STATE_PENDING) for i, url in enumerate(urls)]
+            )
+            return db.total_changes - before
+
+    def lease(self, job_id, worker_id, count, lease_seconds):
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET state = ?, token = NULL, worker = NULL "
+                "WHERE job_id = ? AND state = ? AND lease_expires < ?",
+                (STATE_PENDING, job_id, STATE_LEASED, now)
+            )
+            rows = db.execute(
+                "SELECT url, attempts FROM tasks WHERE job_id = ? AND state = ? AND not_before <= ? "
+                "ORDER BY position LIMIT ?",
+                (job_id, STATE_PENDING, now, count)
+            ).fetchall()
+            leases = []
+            for url, attempts in rows:
+                lease = Lease(job_id, url, uuid.uuid4().hex, attempts + 1)
+                db.execute(
+                    "UPDATE tasks SET state = ?, worker = ?, token = ?, lease_expires = ?, attempts = ? "
+                    "WHERE job_id = ? AND url = ?",
+                    (STATE_LEASED, worker_id, lease.token, now + lease_seconds, lease.attempts, job_id, url)
+                )
+                leases.append(lease)
+            return leases
+
+    def renew(self, leases, lease_seconds):
+        lost = []
+        expires = time.time() + lease_seconds
+        with self._transaction() as db:
+            for lease in leases:
+                changed = db.execute(
+                    "UPDATE tasks SET lease_expires = ? WHERE job_id = ? AND url = ? AND token = ? AND state = ?",
+                    (expires, lease.job_id, lease.url, lease.token, STATE_LEASED)
+                ).rowcount
+                if not changed:
+                    lost.append(lease)
+        return lost
+
+    def complete(self, lease, markdown):
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT worker FROM tasks WHERE job_id = ? AND url = ? AND token = ? AND state = ?",
+                (lease.job_id, lease.url, lease.token, STATE_LEASED)
+            ).fetchone()
+            if not row:
+                return False
+            db.execute(
+                "UPDATE tasks SET state = ?, token = NULL, error = NULL WHERE job_id = ? AND url = ?",
+                (STATE_DONE, lease.job_id, lease.url)
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO results (job_id, url, markdown, worker, completed_at) VALUES (?, ?, ?, ?, ?)",
+                (lease.job_id, lease.url, markdown, row[0], time.time())
+            )
+            return True
+
+    def fail(self, lease, error, retry, max_attempts, retry_delay=0.0):
+        with self._transaction() as db:
+            state = STATE_PENDING if retry and lease.attempts < max_attempts else STATE_FAILED
+            return db.execute(
+                "UPDATE tasks SET state = ?, token = NULL, error = ?, not_before = ? "
+                "WHERE job_id = ? AND url = ? AND token = ? AND state = ?",
+                (state, error, time.time() + retry_delay, lease.job_id, lease.url, lease.token, STATE_LEASED)
+            ).rowcount > 0
+
+    def counts(self, job_id):
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY state",
+                                    (job_id,)).fetchall()
+        return dict(rows)
+
+    def results(self, job_id):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.url, r.markdown FROM results r JOIN tasks t ON t.job_id = r.job_id AND t.url = r.url "
+                "WHERE r.job_id = ? ORDER BY t.position", (job_id,)
+            ).fetchall()
+        return iter(rows)
+
+    def failures(self, job_id):
+        with self._lock:
+            rows = self._db.execute("SELECT url, error FROM tasks WHERE job_id = ? AND state = ?",
+                                    (job_id, STATE_FAILED)).fetchall()
+        return dict(rows)
+
+class Coordinator:
+    """Discovers sitemap URLs and enqueues them as a distributed job"""
+
+    def __init__(self, backend: WorkQueueBackend, crawler: WebCrawler):
+        self.backend = backend
+        self.crawler = crawler
+
+    def submit_sitemap(self, job_id: str, sitemap_url: str, scope: Optional[CrawlScope] = None) -> int:
+        found, urls = self.crawler.discover_sitemap_urls(sitemap_url, scope)
+        if not found:
+            urls = [sitemap_url.replace('/sitemap.xml', '').rstrip('/')]
+        if scope and scope.max_pages:
+            urls = urls[:scope.max_pages]
+        added = self.backend.enqueue(job_id, urls)
+        logger.info("Enqueued %d URLs for job %s", added, job_id)
+        return added
+
+    async def wait(self, job_id: str, poll_interval: float = 5.0):
+        """Report progress until no URL is pending or leased"""
+        while True:
+            counts = await asyncio.to_thread(self.backend.counts, job_id)
+            total = sum(counts.values())
+            logger.info("Job %s: %d/%d done, %d leased, %d failed", job_id, counts.get(STATE_DONE, 0), total,
+                        counts.get(STATE_LEASED, 0), counts.get(STATE_FAILED, 0))
+            if counts.get(STATE_PENDING, 0) == 0 and counts.get(STATE_LEASED, 0) == 0:
+                return counts
+            await asyncio.sleep(poll_interval)
+
+class DistributedWorker:
+    """Pulls URL leases for a job and runs them through the page pipeline"""
+
+    def __init__(self, backend: WorkQueueBackend, crawler: WebCrawler, worker_id: Optional[str] = None,
+                 batch_size: int = 5, lease_seconds: float = 120.0, idle_poll: float = 2.0):
+        self.backend = backend
+        self.crawler = crawler
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.lease_seconds = max(lease_seconds, crawler.retry_policy.page_timeout * 2)
+        self.idle_poll = idle_poll
+        self.completed = 0
+        self.lost = 0
+        self._held: Dict[str, Lease] = {}
+
+    async def _renew_loop(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if self._held:
+                lost = await asyncio.to_thread(self.backend.renew, list(self._held.values()), self.lease_seconds)
+                for lease in lost:
+                    logger.warning("Lease lost for %s", lease.url)
+                    self._held.pop(lease.url, None)
+
+    async def _process(self, crawler, lease: Lease):
+        markdown, error, status_code = await self.crawler._fetch_page(crawler, lease.url, use_triage=True)
+        self._held.pop(lease.url, None)
+        triage = self.crawler.triage
+        if markdown:
+            stored = await asyncio.to_thread(self.backend.complete, lease, markdown)
+            if stored:
+                self.completed += 1
+                await self.crawler._index_page(lease.url, markdown)
+            else:
+                self.lost += 1
+            return
+        if triage and lease.url in triage.skipped:
+            error, retry = f"skipped: {triage.skipped[lease.url]}", False
+        else:
+            retry = self.crawler.retry_policy.classify(error, status_code) == TRANSIENT
+        policy = self.crawler.retry_policy
+        await asyncio.to_thread(self.backend.fail, lease, error, retry, policy.max_attempts,
+                                policy.backoff_delay(lease.attempts))
+
+    async def run(self, job_id: str):
+        """Work until the job has nothing left pending or leased"""
+        logger.info("Worker %s starting on job %s", self.worker_id, job_id)
+        crawler = await self.crawler._open_crawler()
+        renewer = asyncio.create_task(self._renew_loop())
+        try:
+            while True:
+                leases = await asyncio.to_thread(
+                    self.backend.lease, job_id, self.worker_id, self.batch_size, self.lease_seconds)
+                if not leases:
+                    if await asyncio.to_thread(self.backend.is_finished, job_id):
+                        break
+                    await asyncio.sleep(self.idle_poll)
+                    continue
+                for lease in leases:
+                    self._held[lease.url] = lease
+                await asyncio.gather(*(self._process(crawler, lease) for lease in leases))
+                self.crawler.progress_callback(CrawlProgress(
+                    status=f"Worker {self.worker_id}: {self.completed} pages completed",
+                    memory_usage=self.crawler.get_memory_usage(),
+                    pages_crawled=self.completed
+                ))
+        finally:
+            renewer.cancel()
+            await self.crawler._flush_index()
+            await self.crawler._close_crawler(crawler)
+            if self.crawler.triage:
+                await self.crawler.triage.close()
+        logger.info("Worker %s finished: %d completed, %d leases lost", self.worker_id, self.completed, self.lost)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Distributed sitemap crawling")
+    parser.add_argument("role", choices=["coordinator", "worker", "export"])
+    parser.add_argument("--db", required=True, help="Shared SQLite queue file")
+    parser.add_argument("--job", required=True, help="Job id")
+    parser.add_argument("--sitemap", help="Sitemap URL (coordinator)")
+    parser.add_argument("--batch-size", type=int, default=5, help="URLs leased at once (worker)")
+    parser.add_argument("--lease-seconds", type=float, default=120.0)
+    parser.add_argument("--out", help="Export file, .txt or .corpus (export)")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    def report(progress: CrawlProgress):
+        logger.info("%s", progress.status)
+
+    backend = SQLiteWorkQueue(args.db)
+    crawler = WebCrawler(report)
+    if args.role == "coordinator":
+        if not args.sitemap:
+            parser.error("--sitemap is required for the coordinator")
+        coordinator = Coordinator(backend, crawler)
+        coordinator.submit_sitemap(args.job, args.sitemap)
+        asyncio.run(coordinator.wait(args.job))
+    elif args.role == "worker":
+        from src.blocking import ResourceBlockProfile
+        from src.triage import ContentTriage
+        from src.extraction import ExtractionProfiles
+        from src.readiness import ReadinessProfiles
+        crawler.block_profile = ResourceBlockProfile()
+        crawler.triage = ContentTriage()
+        crawler.extraction_profiles = ExtractionProfiles()
+        crawler.readiness = ReadinessProfiles()
+        asyncio.run(DistributedWorker(backend, crawler, batch_size=args.batch_size,
+                                      lease_seconds=args.lease_seconds).run(args.job))
+    else:
+        if not args.out:
+            parser.error("--out is required for export")
+        crawler.export_pages(dict(backend.results(args.job)), args.out)
+        logger.info("Exported job %s to %s", args.job, args.out)
+
+if __name__ == "__main__":
+    main()
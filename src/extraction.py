@@ -0,0 +1,211 @@
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from src.log_config import get_logger
+from src.profile_store import DomainProfileStore
+
+DEFAULT_PROFILE_PATH = os.path.expanduser("~/.webcrawler/extraction_profiles.json")
+
+logger = get_logger("extraction")
+
+# Elements that can be recognised as layout blocks across pages of a site
+CANDIDATE_TAGS = ["main", "article", "section", "div", "header", "footer", "nav", "aside", "ul", "form"]
+# Landmarks dropped whenever they repeat verbatim, however short
+LANDMARK_TAGS = {"header", "footer", "nav", "aside"}
+NOISE_TAGS = ["script", "style", "noscript", "template", "svg"]
+
+MIN_BLOCK_CHARS = 20          # Ignore tiny repeated blocks unless they are landmarks
+MAX_BOILERPLATE_SHARE = 0.5   # A block holding more of the page than this is not chrome
+MIN_CONTENT_SHARE = 0.6       # A <main>/<article> container must hold this much of the non-chrome text
+GENERIC_CONTENT_SHARE = 0.9   # Any other container must hold nearly all of it
+SEMANTIC_CONTENT = ("main", "article")
+MAX_EXCLUDED = 20
+
+_STABLE_CLASS = re.compile(r'^[A-Za-z][\w-]*$')
+_WHITESPACE = re.compile(r'\s+')
+
+@dataclass
+class DomainProfile:
+    domain: str
+    css_selector: Optional[str] = None
+    excluded_selectors: List[str] = field(default_factory=list)
+    learned_at: float = 0.0
+    misses: int = 0
+
+    @property
+    def excluded_selector(self) -> str:
+        return ", ".join(self.excluded_selectors)
+
+    def describe(self) -> str:
+        return f"{self.domain}: content={self.css_selector or 'whole page'}, {len(self.excluded_selectors)} excluded blocks"
+
+@dataclass
+class _Block:
+    text_hash: str
+    length: int
+    count: int
+    ancestors: Tuple[str, ...]
+
+def element_selector(element) -> Optional[str]:
+    """A selector for an element that is likely to be stable across pages of a site"""
+    element_id = element.get("id")
+    if element_id and _STABLE_CLASS.match(element_id) and not any(c.isdigit() for c in element_id):
+        return f"{element.name}#{element_id}"
+    role = element.get("role")
+    if role in ("main", "navigation", "banner", "contentinfo", "complementary"):
+        return f'{element.name}[role="{role}"]'
+    classes = [c for c in element.get("class", []) if _STABLE_CLASS.match(c) and not any(ch.isdigit() for ch in c)]
+    if classes:
+        return element.name + "".join(f".{c}" for c in classes[:2])
+    if element.name in LANDMARK_TAGS or element.name in ("main", "article"):
+        return element.name
+    return None
+
+def _summarize(html: str) -> Tuple[int, Dict[str, _Block]]:
+    """Text length of the page and a fingerprint of every selectable block"""
+    soup = BeautifulSoup(html, "html.parser")
+    body = soup.body or soup
+    for tag in body.find_all(NOISE_TAGS):
+        tag.decompose()
+    total = len(_WHITESPACE.sub(' ', body.get_text(' ')).strip())
+    blocks: Dict[str, _Block] = {}
+    for element in body.find_all(CANDIDATE_TAGS):
+        selector = element_selector(element)
+        if not selector:
+            continue
+        if selector in blocks:
+            blocks[selector].count += 1
+            continue
+        text = _WHITESPACE.sub(' ', element.get_text(' ')).strip()
+        ancestors = tuple(s for s in (element_selector(parent) for parent in element.find_parents(CANDIDATE_TAGS)) if s)
+        blocks[selector] = _Block(hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest(),
+                                  len(text), 1, ancestors)
+    return total, blocks
+
+def learn_profile(domain: str, samples: List[Tuple[int, Dict[str, _Block]]]) -> DomainProfile:
+    """Compare block fingerprints across sample pages of one domain.
+
+    Blocks that appear once per page with identical text on every sample
+    are site chrome (navigation, banners, footers) and get excluded. The
+    content selector is the tightest single block that differs between
+    pages and still holds most of each page's remaining text, preferring
+    <main>/<article> landmarks.
+    """
+    shared = set(samples[0][1])
+    for _, blocks in samples[1:]:
+        shared &= set(blocks)
+
+    boilerplate = []
+    for selector in shared:
+        entries = [blocks[selector] for _, blocks in samples]
+        if any(entry.count != 1 for entry in entries) or len({entry.text_hash for entry in entries}) != 1:
+            continue
+        if not entries[0].length:
+            continue
+        tag = selector.split('#')[0].split('.')[0].split('[')[0]
+        if entries[0].length < MIN_BLOCK_CHARS and tag not in LANDMARK_TAGS:
+            continue
+        if any(entry.length > MAX_BOILERPLATE_SHARE * total for entry, (total, _) in zip(entries, samples)):
+            continue
+        boilerplate.append(selector)
+    boilerplate_set = set(boilerplate)
+    excluded = [s for s in boilerplate if not boilerplate_set.intersection(samples[0][1][s].ancestors)]
+    excluded.sort(key=lambda s: -samples[0][1][s].length)
+    excluded = excluded[:MAX_EXCLUDED]
+
+    best, best_key = None, None
+    for selector in shared - boilerplate_set:
+        entries = [blocks[selector] for _, blocks in samples]
+        if any(entry.count != 1 for entry in entries) or len({entry.text_hash for entry in entries}) == 1:
+            continue
+        if boilerplate_set.intersection(entries[0].ancestors):
+            continue
+        semantic = selector.startswith(SEMANTIC_CONTENT) or 'role="main"' in selector
+        min_share = MIN_CONTENT_SHARE if semantic else GENERIC_CONTENT_SHARE
+        fits = True
+        for entry, (total, blocks) in zip(entries, samples):
+            chrome = sum(blocks[s].length for s in excluded)
+            nested_chrome = sum(blocks[s].length for s in excluded if selector in blocks[s].ancestors)
+            content = entry.length - nested_chrome
+            if content < min_share * max(total - chrome, 1) or entry.length >= 0.95 * total:
+                fits = False
+                break
+        if not fits:
+            continue
+        key = (not semantic, sum(entry.length for entry in entries) / len(entries))
+        if best_key is None or key < best_key:
+            best, best_key = selector, key
+
+    return DomainProfile(domain=domain, css_selector=best, excluded_selectors=excluded, learned_at=time.time())
+
+class ExtractionProfiles(DomainProfileStore):
+    """Per-domain content/excluded selectors, learned from the first pages of a site.
+
+    Until a domain has a profile, crawled pages are sampled; after
+    `sample_pages` of them the profile is learned and saved to `path`, and
+    later pages are scoped to main content before markdown generation.
+    A profile whose content selector keeps matching nothing is dropped and
+    learned again.
+    """
+
+    profile_type = DomainProfile
+    kind = "extraction"
+
+    def __init__(self, path: str = DEFAULT_PROFILE_PATH, sample_pages: int = 3, max_misses: int = 3):
+        self.sample_pages = sample_pages
+        self.max_misses = max_misses
+        self.enabled = True
+        super().__init__(path)
+
+    def for_url(self, url: str) -> Optional[DomainProfile]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._profiles.get(self._domain(url))
+
+    def observe(self, url: str, html: Optional[str]):
+        """Sample an unscoped page; learns the domain's profile once enough pages are seen"""
+        if not self.enabled or not html:
+            return
+        domain = self._domain(url)
+        with self._lock:
+            if domain in self._profiles or len(self._samples.get(domain, [])) >= self.sample_pages:
+                return
+        try:
+            summary = _summarize(html)
+        except Exception as e:
+            logger.warning("Error sampling layout of %s: %s", url, e)
+            return
+        with self._lock:
+            samples = self._samples.setdefault(domain, [])
+            if domain in self._profiles or len(samples) >= self.sample_pages:
+                return
+            samples.append(summary)
+            if len(samples) < self.sample_pages:
+                return
+            profile = learn_profile(domain, samples)
+            del self._samples[domain]
+            self._profiles[domain] = profile
+        logger.info("Learned extraction profile %s", profile.describe())
+        self.save()
+
+    def record_miss(self, url: str):
+        """The content selector matched nothing on a page; forget the profile after repeated misses"""
+        with self._lock:
+            domain = self._domain(url)
+            profile = self._profiles.get(domain)
+            if not profile:
+                return
+            profile.misses += 1
+            dropped = profile.misses >= self.max_misses
+            if dropped:
+                del self._profiles[domain]
+        if dropped:
+            logger.info("Extraction profile for %s no longer matches; relearning", domain)
+            self.save()
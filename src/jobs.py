@@ -0,0 +1,296 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Mapping, Optional
+from urllib.parse import urlparse
+
+from src.crawler import WebCrawler, CrawlProgress
+from src.crawl_scope import CrawlScope
+from src.triage import ContentTriage
+from src.log_config import get_logger
+from src.warc import WarcWriter
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+logger = get_logger("jobs")
+
+class FairScheduler:
+    """Hands out page slots round-robin across jobs under a global cap.
+
+    Every page fetch of every job waits for a slot. When slots free up, the
+    scheduler cycles through jobs that have waiters so a large sitemap job
+    cannot starve a small one, and no job exceeds its own concurrency limit.
+    """
+
+    def __init__(self, max_in_flight: int = 10):
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._running: Dict[str, int] = {}
+        self._limits: Dict[str, int] = {}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._turns: Deque[str] = deque()
+
+    def register(self, job_id: str, limit: int):
+        self._limits[job_id] = max(1, limit)
+        self._running.setdefault(job_id, 0)
+        self._waiters.setdefault(job_id, deque())
+
+    def unregister(self, job_id: str):
+        for waiter in self._waiters.pop(job_id, ()):
+            if not waiter.done():
+                waiter.cancel()
+        self._limits.pop(job_id, None)
+        self._running.pop(job_id, None)
+        if job_id in self._turns:
+            self._turns.remove(job_id)
+
+    def set_max_in_flight(self, max_in_flight: int):
+        self.max_in_flight = max(1, max_in_flight)
+        self._dispatch()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self, job_id: str):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[job_id].append(waiter)
+        if job_id not in self._turns:
+            self._turns.append(job_id)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled; hand the slot back
+                self.release(job_id)
+            raise
+
+    def release(self, job_id: str):
+        self._in_flight -= 1
+        if job_id in self._running:
+            self._running[job_id] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, job_id: str):
+        await self.acquire(job_id)
+        try:
+            yield
+        finally:
+            self.release(job_id)
+
+    def _dispatch(self):
+        idle_turns = 0
+        while self._in_flight < self.max_in_flight and self._turns and idle_turns < len(self._turns):
+            job_id = self._turns.popleft()
+            waiters = self._waiters.get(job_id)
+            while waiters and waiters[0].done():
+                waiters.popleft()  # Cancelled while waiting
+            if not waiters:
+                idle_turns = 0
+                continue
+            if self._running[job_id] >= self._limits[job_id]:
+                self._turns.append(job_id)
+                idle_turns += 1
+                continue
+            waiters.popleft().set_result(None)
+            self._running[job_id] += 1
+            self._in_flight += 1
+            idle_turns = 0
+            if waiters:
+                self._turns.append(job_id)
+
+class BrowserPool:
+    """A fixed set of started crawl4ai browsers shared by all jobs"""
+
+    def __init__(self, factory: Callable, size: int = 2):
+        self.factory = factory
+        self.size = max(1, size)
+        self._crawlers: List = []
+        self._leases: Dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Return the least-leased browser, starting browsers on demand"""
+        async with self._lock:
+            if len(self._crawlers) < self.size and all(self._leases.get(id(c), 0) for c in self._crawlers):
+                crawler = self.factory()
+                await crawler.start()
+                self._crawlers.append(crawler)
+            crawler = min(self._crawlers, key=lambda c: self._leases.get(id(c), 0))
+            self._leases[id(crawler)] = self._leases.get(id(crawler), 0) + 1
+            return crawler
+
+    def release(self, crawler):
+        key = id(crawler)
+        if key in self._leases:
+            self._leases[key] = max(0, self._leases[key] - 1)
+
+    async def discard(self, crawler):
+        """Drop a browser that stopped responding so the next acquire replaces it"""
+        async with self._lock:
+            if crawler in self._crawlers:
+                self._crawlers.remove(crawler)
+                self._leases.pop(id(crawler), None)
+        try:
+            await crawler.close()
+        except:
+            pass
+
+    async def close(self):
+        async with self._lock:
+            for crawler in self._crawlers:
+                try:
+                    await crawler.close()
+                except:
+                    pass
+            self._crawlers = []
+            self._leases = {}
+
+@dataclass
+class CrawlJob:
+    job_id: str
+    mode: str
+    url: str
+    max_concurrent: int = 5
+    scope: Optional[CrawlScope] = None
+    status: str = JOB_QUEUED
+    progress: Optional[CrawlProgress] = None
+    results: Mapping[str, str] = field(default_factory=dict)
+    failed_urls: Dict[str, str] = field(default_factory=dict)
+    skipped_urls: Dict[str, str] = field(default_factory=dict)
+    scores: Optional[Mapping[str, float]] = None  # Link-graph importance per page
+    archive: bool = False  # Write the job's pages to its own WARC files
+    warc_paths: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+class JobQueue:
+    """Runs submitted crawl jobs concurrently on a shared browser pool.
+
+    All methods except `submit_threadsafe` must be called on the queue's
+    event loop. Each job gets its own WebCrawler (and WARC writer) so
+    progress, results, failures and run stats stay separate, while
+    browsers, the page cache and the global concurrency cap are shared.
+    """
+
+    def __init__(self, template: WebCrawler, on_update: Callable[[CrawlJob], None],
+                 max_in_flight: int = 10, pool_size: int = 2):
+        self.template = template
+        self.on_update = on_update
+        self.scheduler = FairScheduler(max_in_flight)
+        self.pool = BrowserPool(template._create_crawler, pool_size)
+        self.jobs: Dict[str, CrawlJob] = {}
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._pending: List[CrawlJob] = []  # Submitted before serve() started
+        self._lock = threading.Lock()
+
+    def new_job(self, mode: str, url: str, max_concurrent: int = 5,
+                scope: Optional[CrawlScope] = None, archive: bool = False) -> CrawlJob:
+        job = CrawlJob(job_id=f"job-{next(self._ids)}", mode=mode, url=url,
+                       max_concurrent=max_concurrent, scope=scope, archive=archive)
+        self.jobs[job.job_id] = job
+        return job
+
+    def submit_threadsafe(self, mode: str, url: str, max_concurrent: int = 5,
+                          scope: Optional[CrawlScope] = None, archive: bool = False) -> CrawlJob:
+        """Queue a job from another thread (e.g. the Qt UI thread) without waiting for the loop"""
+        with self._lock:
+            job = self.new_job(mode, url, max_concurrent, scope, archive)
+            if self._loop is None:
+                self._pending.append(job)
+            else:
+                self._loop.call_soon_threadsafe(self.start, job)
+        return job
+
+    def start(self, job: CrawlJob):
+        self.scheduler.register(job.job_id, job.max_concurrent)
+        job.task = asyncio.get_running_loop().create_task(self._run_job(job))
+
+    def cancel(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if job and job.task and not job.task.done():
+            job.task.cancel()
+
+    def _make_crawler(self, job: CrawlJob) -> WebCrawler:
+        def report(progress: CrawlProgress):
+            job.progress = progress
+            self.on_update(job)
+
+        crawler = WebCrawler(
+            report,
+            block_profile=self.template.block_profile,
+            retry_policy=self.template.retry_policy,
+            page_cache=self.template.page_cache,
+            search_index=self.template.search_index,
+            # Each job owns its HTTP session but shares the content-type cache
+            triage=ContentTriage(type_cache=self.template.triage.type_cache) if self.template.triage else None,
+            extraction_profiles=self.template.extraction_profiles,
+            readiness=self.template.readiness,
+            # Jobs write and close their own files, never a writer another crawl owns
+            warc_writer=WarcWriter(prefix=f"{urlparse(job.url).hostname or 'crawl'}-{job.job_id}") if job.archive else None,
+            link_graph_dir=self.template.link_graph_dir,
+            browser_pool=self.pool,
+            scheduler=self.scheduler,
+            job_id=job.job_id
+        )
+        crawler.cache_mode = self.template.cache_mode
+        crawler.autotune_bounds = self.template.autotune_bounds
+        return crawler
+
+    async def _run_job(self, job: CrawlJob):
+        crawler = self._make_crawler(job)
+        job.status = JOB_RUNNING
+        self.on_update(job)
+        try:
+            if job.mode == "single":
+                content = await crawler.crawl_single_page(job.url)
+                job.results = {"result": content} if content else {}
+            else:
+                job.results = await crawler.crawl_sitemap(job.url, job.max_concurrent, job.scope)
+            job.failed_urls = crawler.failed_urls
+            if crawler.triage:
+                job.skipped_urls = dict(crawler.triage.skipped)
+            job.scores = crawler.page_scores()
+            job.status = JOB_DONE if job.results else JOB_FAILED
+        except asyncio.CancelledError:
+            job.status = JOB_CANCELLED
+        except Exception as e:
+            logger.error("Error in job %s: %s", job.job_id, e, exc_info=True)
+            job.status = JOB_FAILED
+            job.error = str(e)
+        finally:
+            self.scheduler.unregister(job.job_id)
+            if crawler.warc_writer:
+                await asyncio.to_thread(crawler.warc_writer.close)
+                job.warc_paths = list(crawler.warc_writer.paths)
+            self.on_update(job)
+
+    async def serve(self):
+        """Run until stop() is called, then cancel remaining jobs and close browsers"""
+        self._stopped = asyncio.Event()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            pending, self._pending = self._pending, []
+        for job in pending:
+            self.start(job)
+        await self._stopped.wait()
+        pending = [job.task for job in self.jobs.values() if job.task and not job.task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self.pool.close()
+
+    def stop_threadsafe(self):
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
@@ -0,0 +1,177 @@
+import glob
+import os
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import numpy as np
+
+DEFAULT_GRAPH_DIR = os.path.expanduser("~/.webcrawler/graphs")
+
+def normalize_link(url: str) -> str:
+    """Drop fragments and trailing slashes so /docs/ and /docs#intro are one node"""
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+class LinkScores(Mapping):
+    """Read-only url -> importance mapping that accepts any spelling of a URL"""
+
+    def __init__(self, scores: Dict[str, float]):
+        self._scores = scores
+
+    def __getitem__(self, url: str) -> float:
+        return self._scores[normalize_link(url)]
+
+    def __contains__(self, url) -> bool:
+        return isinstance(url, str) and normalize_link(url) in self._scores
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._scores)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+class LinkGraph:
+    """Internal link graph of a site: URL ids plus CSR adjacency in NumPy arrays.
+
+    Out-links are collected per page while crawling (a page crawled again
+    replaces its earlier links) and compiled into `indptr`/`indices` CSR
+    arrays on demand. Scores are PageRank scaled so the average page is 1.0.
+    """
+
+    def __init__(self):
+        self.urls: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._aliases: Dict[str, int] = {}  # Raw link spelling -> node, skips re-normalizing nav links
+        self._out: Dict[int, array] = {}
+        self._csr = None
+
+    def _id(self, url: str) -> int:
+        node = self._ids.get(url)
+        if node is None:
+            node = len(self.urls)
+            self.urls.append(url)
+            self._ids[url] = node
+        return node
+
+    def _node(self, link: str) -> int:
+        node = self._aliases.get(link)
+        if node is None:
+            node = self._id(normalize_link(link))
+            self._aliases[link] = node
+        return node
+
+    def add_page(self, url: str, links: Iterable[str]):
+        """Record a crawled page's internal links"""
+        source = self._node(url)
+        targets = {self._node(link) for link in links if link}
+        targets.discard(source)
+        self._out[source] = array('I', sorted(targets))
+        self._csr = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.urls)
+
+    @property
+    def page_count(self) -> int:
+        """Nodes whose out-links are known, i.e. pages that were crawled"""
+        return len(self._out)
+
+    def csr(self):
+        """(indptr, indices) for out-links, compiled and cached until the graph changes"""
+        if self._csr is None:
+            n = len(self.urls)
+            counts = np.zeros(n, dtype=np.int64)
+            for source, targets in self._out.items():
+                counts[source] = len(targets)
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(counts, out=indptr[1:])
+            indices = np.empty(int(indptr[-1]), dtype=np.int32)
+            for source, targets in self._out.items():
+                indices[indptr[source]:indptr[source + 1]] = np.frombuffer(targets, dtype=np.uint32)
+            self._csr = (indptr, indices)
+        return self._csr
+
+    def in_degree(self) -> np.ndarray:
+        indptr, indices = self.csr()
+        return np.bincount(indices, minlength=len(self.urls))
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+        n = len(self.urls)
+        if n == 0:
+            return np.zeros(0)
+        indptr, indices = self.csr()
+        out_degree = np.diff(indptr)
+        dangling = out_degree == 0
+        safe_degree = np.where(dangling, 1, out_degree)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            shares = np.repeat(rank / safe_degree, out_degree)
+            updated = np.bincount(indices, weights=shares, minlength=n)
+            updated = damping * (updated + rank[dangling].sum() / n) + (1 - damping) / n
+            delta = np.abs(updated - rank).sum()
+            rank = updated
+            if delta < tol:
+                break
+        return rank
+
+    def scores(self, method: str = "pagerank") -> LinkScores:
+        """Importance per URL: PageRank (average 1.0) or raw in-degree"""
+        if method == "indegree":
+            values = self.in_degree().astype(float)
+        else:
+            values = self.pagerank() * len(self.urls)
+        return LinkScores(dict(zip(self.urls, values.tolist())))
+
+    def rank_urls(self, urls: List[str]) -> List[str]:
+        """Sort URLs by PageRank, highest first; unknown URLs keep their order at the end"""
+        rank = self.pagerank()
+        def score(url: str) -> float:
+            node = self._aliases.get(url)
+            if node is None:
+                node = self._ids.get(normalize_link(url))
+            return -rank[node] if node is not None else 0.0
+        return sorted(urls, key=score)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        indptr, indices = self.csr()
+        known = np.zeros(len(self.urls), dtype=bool)
+        known[list(self._out)] = True
+        np.savez_compressed(
+            path,
+            urls=np.frombuffer("\n".join(self.urls).encode('utf-8'), dtype=np.uint8),
+            indptr=indptr, indices=indices, known=known
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinkGraph":
+        graph = cls()
+        with np.load(path) as data:
+            text = data["urls"].tobytes().decode('utf-8')
+            indptr, indices, known = data["indptr"], data["indices"], data["known"]
+            for url in (text.split("\n") if text else []):
+                graph._id(url)
+            for source in np.flatnonzero(known):
+                graph._out[int(source)] = array('I', indices[indptr[source]:indptr[source + 1]].astype(np.uint32).tobytes())
+        return graph
+
+    @staticmethod
+    def path_for(directory: str, host: str, run_name: str) -> str:
+        return os.path.join(directory, host, f"{run_name}.npz")
+
+    @classmethod
+    def latest(cls, directory: str, host: str) -> Optional["LinkGraph"]:
+        """The most recently saved graph for a host, if any"""
+        paths = glob.glob(os.path.join(directory, host, "*.npz"))
+        if not paths:
+            return None
+        try:
+            return cls.load(max(paths, key=os.path.getmtime))
+        except Exception:
+            return None
@@ -0,0 +1,114 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Dict, Optional
+
+ROOT_LOGGER = "WebScout"
+LOG_LEVEL_ENV_VAR = "WEBCRAWLER_LOG_LEVEL"      # e.g. DEBUG
+MODULE_LEVELS_ENV_VAR = "WEBCRAWLER_LOG_LEVELS"  # e.g. crawler=DEBUG,ui=WARNING
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Per-URL messages logged with extra=SAMPLED pass 1 in `sample_every`
+SAMPLED = {"sampled": True}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def get_logger(module: str) -> logging.Logger:
+    """Logger for a module under the application's root logger, e.g. WebScout.crawler"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{module}")
+
+class SamplingFilter(logging.Filter):
+    """Let through the first and then every Nth record of each sampled message.
+
+    Only records logged with extra=SAMPLED are sampled, counted per message
+    template, so "Crawled %s" is thinned without touching other messages.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, sample_every: int = 100):
+        super().__init__()
+        self.sample_every = max(1, sample_every)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        key = f"{record.name}:{record.msg}"
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.sample_every == 0
+
+def _parse_levels(spec: str) -> Dict[str, int]:
+    levels = {}
+    for part in spec.split(','):
+        if '=' not in part:
+            continue
+        module, level = part.split('=', 1)
+        level = logging.getLevelName(level.strip().upper())
+        if isinstance(level, int):
+            levels[module.strip()] = level
+    return levels
+
+def setup_logging(log_file: Optional[str] = None, level: int = logging.INFO, console: bool = True,
+                  module_levels: Optional[Dict[str, int]] = None, sample_every: int = 100,
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5) -> logging.Logger:
+    """Route the application's logging through a queue to a background writer thread.
+
+    Callers only pay for a level check and a queue put; formatting and file
+    and console I/O happen on the listener thread. The log file rotates at
+    `max_bytes`. Levels can be raised per module (`module_levels` or the
+    WEBCRAWLER_LOG_LEVELS environment variable) without turning on DEBUG
+    everywhere.
+    """
+    global _listener
+    env_level = logging.getLevelName(os.environ.get(LOG_LEVEL_ENV_VAR, "").strip().upper())
+    if isinstance(env_level, int):
+        level = env_level
+
+    handlers = []
+    formatter = logging.Formatter(LOG_FORMAT)
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_every))
+
+    root = logging.getLogger(ROOT_LOGGER)
+    if _listener:
+        _listener.stop()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    root.propagate = False
+
+    levels = dict(module_levels or {})
+    levels.update(_parse_levels(os.environ.get(MODULE_LEVELS_ENV_VAR, "")))
+    for module, module_level in levels.items():
+        get_logger(module).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return root
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
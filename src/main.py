@@ -1,28 +1,16 @@
 import sys
 import os
-import logging
 from datetime import datetime
 
+from src.log_config import setup_logging
+
 # Set up logging in the project directory
 project_dir = os.path.dirname(os.path.abspath(__file__))
 log_dir = os.path.join(os.path.dirname(project_dir), "logs")
-os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, f"webscout_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 
-logging.basicConfig(
-    filename=log_file,
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-logger = logging.getLogger('WebScout')
-
-# Also log to console
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+# Queue-backed: file and console writes happen off the UI and crawler threads
+logger = setup_logging(log_file)
 
 try:
     logger.info("Starting application")
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.webcrawler/cache")
+
+class PageCacheMode(str, Enum):
+    READ_THROUGH = "read_through"  # Serve cached pages, crawl and store misses
+    REFRESH = "refresh"            # Always crawl, overwrite the cache
+    BYPASS = "bypass"              # Neither read nor write the cache
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def summary(self) -> str:
+        return f"cache {self.hits} hits / {self.misses} misses"
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share a cache entry"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+class PageCache:
+    """On-disk page cache keyed by canonical URL.
+
+    Bodies are zlib-compressed and stored once per content hash, so pages
+    that render to identical markdown share storage. An entry's last access
+    time drives LRU eviction once the stored bytes exceed `max_bytes`, and
+    entries older than `ttl_seconds` are treated as misses. Calls block on
+    SQLite and are thread-safe, so async callers run them in a worker thread.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600, store_html: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.store_html = store_html
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        # The cache is created on the UI thread and used from the crawler thread
+        self._db = sqlite3.connect(os.path.join(cache_dir, "pages.db"), check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                markdown_hash TEXT NOT NULL,
+                html_hash TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed ON pages(accessed_at);
+            CREATE INDEX IF NOT EXISTS pages_fetched ON pages(fetched_at);
+            CREATE INDEX IF NOT EXISTS pages_markdown_hash ON pages(markdown_hash);
+            CREATE INDEX IF NOT EXISTS pages_html_hash ON pages(html_hash);
+        """)
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def reset_stats(self):
+        self.stats = CacheStats()
+
+    def get(self, url: str) -> Optional[str]:
+        """Return cached markdown for a URL, or None on a miss"""
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT p.fetched_at, b.data FROM pages p JOIN blobs b ON b.hash = p.markdown_hash "
+                "WHERE p.url = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds is not None and now - row[0] > self.ttl_seconds):
+                self.stats.misses += 1
+                return None
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, key))
+            self._db.commit()
+            self.stats.hits += 1
+        return zlib.decompress(row[1]).decode('utf-8')
+
+    def get_html(self, url: str) -> Optional[str]:
+        """Return the cached raw HTML for a URL if it was stored"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT b.data FROM pages p JOIN blobs b ON b.hash = p.html_hash WHERE p.url = ?",
+                (canonical_url(url),)
+            ).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def put(self, url: str, markdown: str, html: Optional[str] = None):
+        """Store a rendered page, then evict down to the size cap"""
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT markdown_hash, html_hash FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            markdown_hash = self._put_blob(markdown)
+            html_hash = self._put_blob(html) if (html and self.store_html) else None
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, markdown_hash, html_hash, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, markdown_hash, html_hash, now, now)
+            )
+            if previous:
+                self._release(previous)
+            self._evict(now, keep=key)
+            self._db.commit()
+            self.stats.writes += 1
+
+    def _put_blob(self, text: str) -> str:
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        if self._db.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+            return digest
+        data = zlib.compress(raw, 6)
+        self._db.execute("INSERT INTO blobs (hash, data, size) VALUES (?, ?, ?)",
+                         (digest, data, len(data)))
+        self._total_bytes += len(data)
+        return digest
+
+    def _release(self, hashes):
+        """Delete blobs no longer referenced by any page"""
+        for digest in set(h for h in hashes if h):
+            in_use = self._db.execute(
+                "SELECT 1 FROM pages WHERE markdown_hash = ? OR html_hash = ? LIMIT 1",
+                (digest, digest)
+            ).fetchone()
+            if in_use:
+                continue
+            row = self._db.execute("SELECT size FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if row:
+                self._db.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+                self._total_bytes -= row[0]
+
+    def _delete_pages(self, rows):
+        self._db.executemany("DELETE FROM pages WHERE url = ?", [(row[0],) for row in rows])
+        self.stats.evictions += len(rows)
+        self._release([h for row in rows for h in row[1:]])
+
+    def _evict(self, now: float, keep: Optional[str] = None):
+        """Drop expired pages, then least recently used ones until under the cap; `keep` is never evicted"""
+        if self.ttl_seconds is not None:
+            expired = self._db.execute(
+                "SELECT url, markdown_hash, html_hash FROM pages WHERE fetched_at < ?",
+                (now - self.ttl_seconds,)
+            ).fetchall()
+            if expired:
+                self._delete_pages(expired)
+        while self._total_bytes > self.max_bytes:
+            oldest = self._db.execute(
+                "SELECT url, markdown_hash, html_hash FROM pages WHERE url != ? ORDER BY accessed_at LIMIT 16",
+                (keep or "",)
+            ).fetchall()
+            if not oldest:
+                break
+            self._delete_pages(oldest)
+
+    def size_bytes(self) -> int:
+        return self._total_bytes
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+            self._db.execute("DELETE FROM blobs")
+            self._db.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
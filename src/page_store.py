@@ -0,0 +1,147 @@
+import hashlib
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+# Pages smaller than this are kept uncompressed; the header overhead isn't worth it
+MIN_COMPRESS_SIZE = 256
+
+class _PageRecord:
+    __slots__ = ("prefix_id", "suffix", "body", "size", "compressed")
+
+    def __init__(self, prefix_id: int, suffix: str, body: bytes, size: int, compressed: bool):
+        self.prefix_id = prefix_id
+        self.suffix = suffix
+        self.body = body
+        self.size = size
+        self.compressed = compressed
+
+def _url_key(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class PageStore(MutableMapping):
+    """Compact url -> markdown mapping for crawl results.
+
+    Each page is a slotted record holding an interned URL prefix id, the
+    URL suffix and the compressed body; markdown is only decompressed when
+    a page is read. It behaves like the plain dict it replaces, including
+    insertion order, so the UI and export code can use it unchanged.
+    Records are keyed by a 64-bit hash of the URL; a URL whose hash is
+    already taken by a different URL is keyed by the URL itself instead.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, str]] = None, codec: str = "zlib", level: int = 6):
+        if codec == "zstd" and zstandard is None:
+            codec = "zlib"
+        self.codec = codec
+        self.level = level
+        self._records: Dict[Union[int, str], _PageRecord] = {}
+        self._prefixes: List[str] = []
+        self._prefix_ids: Dict[str, int] = {}
+        self._raw_bytes = 0
+        self._stored_bytes = 0
+        if codec == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level)
+            self._decompressor = zstandard.ZstdDecompressor()
+        if pages:
+            self.update(pages)
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.codec == "zstd":
+            return self._compressor.compress(raw)
+        return zlib.compress(raw, self.level)
+
+    def _decompress(self, body: bytes) -> bytes:
+        if self.codec == "zstd":
+            return self._decompressor.decompress(body)
+        return zlib.decompress(body)
+
+    def _split(self, url: str):
+        cut = url.rfind('/') + 1
+        prefix, suffix = url[:cut], url[cut:]
+        prefix_id = self._prefix_ids.get(prefix)
+        if prefix_id is None:
+            prefix_id = len(self._prefixes)
+            self._prefixes.append(prefix)
+            self._prefix_ids[prefix] = prefix_id
+        return prefix_id, suffix
+
+    def _url(self, record: _PageRecord) -> str:
+        return self._prefixes[record.prefix_id] + record.suffix
+
+    def _find(self, url: str) -> Optional[Union[int, str]]:
+        """Key of the URL's record, checking the stored URL so a hash collision is never a match"""
+        key = _url_key(url)
+        record = self._records.get(key)
+        if record is not None and self._url(record) == url:
+            return key
+        return url if url in self._records else None
+
+    def _key(self, url: str) -> Union[int, str]:
+        key = self._find(url)
+        if key is None:
+            raise KeyError(url)
+        return key
+
+    def __setitem__(self, url: str, markdown: str):
+        raw = markdown.encode('utf-8')
+        body, compressed = raw, False
+        if len(raw) >= MIN_COMPRESS_SIZE:
+            packed = self._compress(raw)
+            if len(packed) < len(raw):
+                body, compressed = packed, True
+        key = self._find(url)
+        if key is not None:
+            # Replacing in place keeps the page's original position, as a dict would
+            self._forget(self._records[key])
+        else:
+            key = _url_key(url)
+            if key in self._records:
+                # Another URL has this hash; both stay reachable
+                key = url
+        prefix_id, suffix = self._split(url)
+        self._records[key] = _PageRecord(prefix_id, suffix, body, len(raw), compressed)
+        self._raw_bytes += len(raw)
+        self._stored_bytes += len(body)
+
+    def __getitem__(self, url: str) -> str:
+        record = self._records[self._key(url)]
+        body = self._decompress(record.body) if record.compressed else record.body
+        return body.decode('utf-8')
+
+    def __delitem__(self, url: str):
+        self._forget(self._records.pop(self._key(url)))
+
+    def _forget(self, record: _PageRecord):
+        self._raw_bytes -= record.size
+        self._stored_bytes -= len(record.body)
+
+    def __contains__(self, url) -> bool:
+        return isinstance(url, str) and self._find(url) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for record in list(self._records.values()):
+            yield self._url(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __repr__(self) -> str:
+        return f"PageStore({len(self)} pages, {self.stored_bytes / (1024 * 1024):.1f} MB stored)"
+
+    def page_size(self, url: str) -> int:
+        """Uncompressed size of a page in bytes, without decompressing it"""
+        return self._records[self._key(url)].size
+
+    @property
+    def raw_bytes(self) -> int:
+        return self._raw_bytes
+
+    @property
+    def stored_bytes(self) -> int:
+        return self._stored_bytes
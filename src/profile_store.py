@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from src.log_config import get_logger
+
+logger = get_logger("profile_store")
+
+class DomainProfileStore:
+    """Learned per-domain profiles, kept in memory and saved as one JSON file.
+
+    Subclasses set `profile_type` (a dataclass with a `misses` counter) and
+    `kind` (used in log messages), and learn profiles from pages they
+    collect in `_samples`. All access to `_profiles`/`_samples` holds `_lock`.
+    """
+
+    profile_type: type = None
+    kind = "domain"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._profiles: Dict[str, Any] = {}
+        self._samples: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._profiles = {domain: self.profile_type(**entry) for domain, entry in data.items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Error loading %s profiles: %s", self.kind, e)
+
+    def save(self):
+        with self._lock:
+            data = {domain: asdict(profile) for domain, profile in self._profiles.items()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error("Error saving %s profiles: %s", self.kind, e)
+
+    @staticmethod
+    def _domain(url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    def record_hit(self, url: str):
+        """The domain's profile worked for a page; reset its miss count"""
+        with self._lock:
+            profile = self._profiles.get(self._domain(url))
+            if profile:
+                profile.misses = 0
+
+    def clear(self, domain: Optional[str] = None):
+        with self._lock:
+            if domain:
+                self._profiles.pop(domain, None)
+                self._samples.pop(domain, None)
+            else:
+                self._profiles = {}
+                self._samples = {}
+        self.save()
+
+    def all_profiles(self) -> List[Any]:
+        with self._lock:
+            return list(self._profiles.values())
+
+    def __len__(self) -> int:
+        return len(self._profiles)
@@ -0,0 +1,141 @@
+import asyncio
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from src.log_config import get_logger
+
+PROFILE_ENV_VAR = "WEBCRAWLER_PROFILE"
+PROFILE_DIR_ENV_VAR = "WEBCRAWLER_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = os.path.expanduser("~/.webcrawler/profiles")
+
+logger = get_logger("profiling")
+
+def profiling_requested() -> bool:
+    """True when profiling is switched on through the environment"""
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+class ProfileSession:
+    """Captures profiling data for one crawl run into its own directory.
+
+    Files written on stop():
+      cprofile.pstats   - cProfile stats for the crawler thread (snakeviz, gprof2dot)
+      stacks.collapsed  - sampled stacks in collapsed format (flamegraph.pl, speedscope)
+      tracemalloc.txt   - top allocation sites, one block per snapshot interval
+      loop_lag.csv      - event-loop lag samples (time, lag in ms)
+    start() must be called on the thread that runs the crawl's event loop.
+    """
+
+    def __init__(self, run_dir: str, sample_interval: float = 0.005,
+                 snapshot_interval: float = 10.0, lag_interval: float = 0.1, top_allocations: int = 25):
+        self.run_dir = run_dir
+        self.sample_interval = sample_interval
+        self.snapshot_interval = snapshot_interval
+        self.lag_interval = lag_interval
+        self.top_allocations = top_allocations
+        self._profile = cProfile.Profile()
+        self._stacks: Counter = Counter()
+        self._lag_samples = []
+        self._stop = threading.Event()
+        self._threads = []
+        self._target_ident: Optional[int] = None
+        self._started_tracemalloc = False
+        self._started_at = 0.0
+
+    def start(self):
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._started_at = time.monotonic()
+        self._target_ident = threading.get_ident()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+        for target in (self._sample_stacks, self._snapshot_allocations):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._profile.enable()
+        logger.info("Profiling crawl run into %s", self.run_dir)
+
+    async def watch(self, coro):
+        """Run a coroutine while sampling event-loop lag"""
+        lag_task = asyncio.create_task(self._measure_loop_lag())
+        try:
+            return await coro
+        finally:
+            lag_task.cancel()
+
+    async def _measure_loop_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - expected)
+            self._lag_samples.append((time.monotonic() - self._started_at, lag * 1000))
+
+    def _sample_stacks(self):
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._target_ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self._stacks[';'.join(reversed(stack))] += 1
+
+    def _snapshot_allocations(self):
+        while not self._stop.wait(self.snapshot_interval):
+            self._write_allocations()
+
+    def _write_allocations(self):
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        elapsed = time.monotonic() - self._started_at
+        with open(os.path.join(self.run_dir, "tracemalloc.txt"), 'a', encoding='utf-8') as f:
+            f.write(f"=== t={elapsed:.1f}s current={current / (1024 * 1024):.1f} MB "
+                    f"peak={peak / (1024 * 1024):.1f} MB ===\n")
+            for stat in snapshot.statistics('lineno')[:self.top_allocations]:
+                f.write(f"{stat}\n")
+            f.write("\n")
+
+    def stop(self):
+        self._profile.disable()
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        try:
+            self._profile.dump_stats(os.path.join(self.run_dir, "cprofile.pstats"))
+            with open(os.path.join(self.run_dir, "stacks.collapsed"), 'w', encoding='utf-8') as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(os.path.join(self.run_dir, "loop_lag.csv"), 'w', encoding='utf-8') as f:
+                f.write("elapsed_s,lag_ms\n")
+                for elapsed, lag in self._lag_samples:
+                    f.write(f"{elapsed:.3f},{lag:.2f}\n")
+            self._write_allocations()
+            logger.info("Profile written to %s", self.run_dir)
+        except Exception as e:
+            logger.error("Error writing profile: %s", e)
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+def session_for_run(label: str, enabled: bool = False) -> Optional[ProfileSession]:
+    """Create a profile session for a run if the UI toggle or env var asks for one"""
+    if not (enabled or profiling_requested()):
+        return None
+    root = os.environ.get(PROFILE_DIR_ENV_VAR) or DEFAULT_PROFILE_DIR
+    run_dir = os.path.join(root, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{label}")
+    return ProfileSession(run_dir)
@@ -0,0 +1,228 @@
+import os
+import re
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.log_config import get_logger
+from src.profile_store import DomainProfileStore
+
+DEFAULT_READINESS_PATH = os.path.expanduser("~/.webcrawler/readiness_profiles.json")
+
+logger = get_logger("readiness")
+
+STRATEGY_STATIC = "static"    # Take the DOM as soon as it is parsed
+STRATEGY_DYNAMIC = "dynamic"  # Wait until text and network activity go quiet
+
+SETTLE_ATTRIBUTE = "data-webcrawler-settle"
+_SETTLE_MARK = re.compile(r'\s' + SETTLE_ATTRIBUTE + r'="(\d+),([01]),([01])"')
+SHORT_PAGE_SHARE = 0.25  # A static page with less text than this share of the domain's typical page is suspect
+
+def stability_wait(quiet_ms: int, cap_ms: int) -> str:
+    """A crawl4ai wait_for function: ready once body text and resource count stop changing.
+
+    crawl4ai polls the function every 100 ms. It gives up after `cap_ms`
+    whatever the page does, and stamps "<ms until quiet>,<changed>,<capped>"
+    on <html> so the crawler can learn how the domain renders.
+    """
+    return f"""() => {{
+        const now = Date.now();
+        const s = window.__webcrawlerSettle || (window.__webcrawlerSettle = {{start: now, since: now, text: -1, resources: -1, changed: false}});
+        const text = document.body ? document.body.innerText.length : 0;
+        const resources = performance.getEntriesByType('resource').length;
+        if (text !== s.text || resources !== s.resources) {{
+            if (s.text >= 0 && text !== s.text) s.changed = true;
+            s.text = text; s.resources = resources; s.since = now;
+        }}
+        const quiet = text > 0 && now - s.since >= {quiet_ms};
+        const capped = now - s.start >= {cap_ms};
+        if (quiet || capped) {{
+            document.documentElement.setAttribute('{SETTLE_ATTRIBUTE}',
+                (s.since - s.start) + ',' + (s.changed ? 1 : 0) + ',' + (quiet ? 0 : 1));
+        }}
+        return quiet || capped;
+    }}"""
+
+def read_settle_marker(html: Optional[str]) -> Tuple[Optional[Tuple[int, bool, bool]], Optional[str]]:
+    """((settle ms, content changed, hit the cap) or None, html without the marker)"""
+    if not html:
+        return None, html
+    match = _SETTLE_MARK.search(html, 0, 4096)
+    if not match:
+        return None, html
+    settle = (int(match.group(1)), match.group(2) == "1", match.group(3) == "1")
+    return settle, html[:match.start()] + html[match.end():]
+
+@dataclass
+class ReadinessProfile:
+    domain: str
+    strategy: str = STRATEGY_STATIC
+    cap_ms: int = 0             # Dynamic pages stop waiting here even if they never settle
+    typical_chars: int = 0      # Median markdown length while sampling
+    scoped: bool = False        # typical_chars was measured on pages narrowed by an extraction profile
+    learned_at: float = 0.0
+    misses: int = 0             # Static pages in a row that came back short
+    unchanged: int = 0          # Dynamic pages in a row whose content was complete at DOM ready
+
+    def describe(self) -> str:
+        if self.strategy == STRATEGY_DYNAMIC:
+            return f"{self.domain}: wait for content to settle (cap {self.cap_ms / 1000:.1f}s)"
+        return f"{self.domain}: DOM content loaded"
+
+@dataclass
+class ReadinessStats:
+    static_pages: int = 0
+    dynamic_pages: int = 0
+    sampled_pages: int = 0
+    rescued_pages: int = 0
+    capped_pages: int = 0
+
+    def summary(self) -> str:
+        summary = f"readiness {self.static_pages} static / {self.dynamic_pages + self.sampled_pages} waited"
+        if self.rescued_pages:
+            summary += f", {self.rescued_pages} re-rendered"
+        return summary
+
+class ReadinessProfiles(DomainProfileStore):
+    """Per-domain page readiness: how long the browser waits before taking the DOM.
+
+    A domain's first `sample_pages` pages wait for their content to settle
+    (text and network quiet for `quiet_ms`, never past `hard_cap_ms`). If
+    none of them changed after the DOM was parsed the domain is static and
+    later pages are taken at DOMContentLoaded; otherwise it stays dynamic
+    with a cap fitted to the slowest sample. Static pages that come back
+    much shorter than usual are re-fetched with the settle wait, and
+    repeated misses move the domain to dynamic; dynamic domains whose pages
+    stop changing move back to static. Pages narrowed by an extraction
+    profile are only compared with a length measured on narrowed pages, so
+    the typical length is re-measured once such a profile applies.
+    """
+
+    profile_type = ReadinessProfile
+    kind = "readiness"
+
+    def __init__(self, path: str = DEFAULT_READINESS_PATH, sample_pages: int = 3, max_misses: int = 2,
+                 quiet_ms: int = 500, hard_cap_ms: int = 10000, demote_after: int = 20):
+        self.sample_pages = sample_pages
+        self.max_misses = max_misses
+        self.quiet_ms = quiet_ms
+        self.hard_cap_ms = hard_cap_ms
+        self.demote_after = demote_after
+        self.enabled = True
+        super().__init__(path)
+
+    def for_url(self, url: str) -> Optional[ReadinessProfile]:
+        """The domain's learned profile; None while it is still being sampled"""
+        with self._lock:
+            return self._profiles.get(self._domain(url))
+
+    def wait_options(self, profile: Optional[ReadinessProfile]) -> Dict[str, Any]:
+        """CrawlerRunConfig arguments for a page of a domain with this profile"""
+        if profile is not None and profile.strategy == STRATEGY_STATIC:
+            return {"wait_until": "domcontentloaded", "delay_before_return_html": 0}
+        cap_ms = profile.cap_ms if profile is not None and profile.cap_ms else self.hard_cap_ms
+        return {"wait_until": "domcontentloaded", "wait_for": stability_wait(self.quiet_ms, cap_ms)}
+
+    def is_short(self, profile: Optional[ReadinessProfile], markdown: Optional[str], scoped: bool = False) -> bool:
+        """A static page whose text looks like an unrendered shell of the domain's usual pages"""
+        if profile is None or profile.strategy != STRATEGY_STATIC or profile.scoped != scoped:
+            return False
+        return len(markdown or "") < profile.typical_chars * SHORT_PAGE_SHARE
+
+    def observe(self, url: str, html: Optional[str], markdown: Optional[str],
+                stats: Optional[ReadinessStats] = None, scoped: bool = False) -> Optional[str]:
+        """Learn from a fetched page's settle timing; returns its HTML with the timing marker removed.
+
+        `stats` are the calling crawl's own counters; the profiles are shared
+        between crawls. `scoped` says an extraction profile narrowed the page.
+        Saving a learned profile writes the JSON file, so async callers run
+        this in a worker thread.
+        """
+        stats = stats or ReadinessStats()
+        settle, html = read_settle_marker(html)
+        domain = self._domain(url)
+        if settle is None:
+            with self._lock:
+                stats.static_pages += 1
+            if scoped and self._rebaseline(domain, len(markdown or "")):
+                self.save()
+            return html
+        settle_ms, changed, capped = settle
+        learned = None
+        with self._lock:
+            stats.capped_pages += capped
+            profile = self._profiles.get(domain)
+            if profile is None:
+                stats.sampled_pages += 1
+                samples = self._samples.setdefault(domain, [])
+                samples.append((settle_ms, changed, len(markdown or ""), scoped))
+                if len(samples) >= self.sample_pages:
+                    learned = self._learn(domain, samples)
+                    del self._samples[domain]
+                    self._profiles[domain] = learned
+            else:
+                stats.dynamic_pages += 1
+                profile.unchanged = 0 if changed else profile.unchanged + 1
+                if profile.strategy == STRATEGY_DYNAMIC and profile.unchanged >= self.demote_after:
+                    profile.strategy = STRATEGY_STATIC
+                    profile.misses = 0
+                    learned = profile
+        if learned:
+            logger.info("Learned page readiness %s", learned.describe())
+            self.save()
+        elif scoped and self._rebaseline(domain, len(markdown or "")):
+            self.save()
+        return html
+
+    def _rebaseline(self, domain: str, chars: int) -> bool:
+        """Collect narrowed page lengths for a profile measured on whole pages; True once it is re-measured"""
+        with self._lock:
+            profile = self._profiles.get(domain)
+            if profile is None or profile.scoped:
+                return False
+            # Sampling is over for a domain with a profile, so its sample list is free to reuse
+            samples = self._samples.setdefault(domain, [])
+            samples.append((0, False, chars, True))
+            if len(samples) < self.sample_pages:
+                return False
+            profile.typical_chars = int(statistics.median(chars for _, _, chars, _ in samples))
+            profile.scoped = True
+            profile.misses = 0
+            del self._samples[domain]
+        logger.info("Page readiness for %s re-measured on extracted content: typical %d chars",
+                    domain, profile.typical_chars)
+        return True
+
+    def _learn(self, domain: str, samples: List[Tuple[int, bool, int, bool]]) -> ReadinessProfile:
+        # Measure the typical length on narrowed pages only if every sample was narrowed
+        scoped = all(sample_scoped for _, _, _, sample_scoped in samples)
+        typical_chars = int(statistics.median(chars for _, _, chars, sample_scoped in samples
+                                              if sample_scoped == scoped))
+        if not any(changed for _, changed, _, _ in samples):
+            return ReadinessProfile(domain, STRATEGY_STATIC, typical_chars=typical_chars, scoped=scoped,
+                                    learned_at=time.time())
+        slowest = max(settle_ms for settle_ms, _, _, _ in samples)
+        # Room for pages slower than the samples, but never past the hard cap
+        cap_ms = min(self.hard_cap_ms, max(2 * slowest, 1000) + self.quiet_ms)
+        return ReadinessProfile(domain, STRATEGY_DYNAMIC, cap_ms=cap_ms, typical_chars=typical_chars,
+                                scoped=scoped, learned_at=time.time())
+
+    def record_miss(self, url: str, stats: Optional[ReadinessStats] = None):
+        """A static page came back short and was re-rendered; switch the domain to waiting after repeated misses"""
+        with self._lock:
+            if stats:
+                stats.rescued_pages += 1
+            profile = self._profiles.get(self._domain(url))
+            if not profile or profile.strategy != STRATEGY_STATIC:
+                return
+            profile.misses += 1
+            promoted = profile.misses >= self.max_misses
+            if promoted:
+                profile.strategy = STRATEGY_DYNAMIC
+                profile.cap_ms = self.hard_cap_ms
+                profile.misses = 0
+                profile.unchanged = 0
+        if promoted:
+            logger.info("Page readiness for %s changed: %s", profile.domain, profile.describe())
+            self.save()
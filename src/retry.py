@@ -0,0 +1,119 @@
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# Substrings of crawl4ai/Playwright error messages that are worth retrying
+TRANSIENT_MARKERS = (
+    "timeout",
+    "timed out",
+    "net::err_connection",
+    "net::err_network",
+    "net::err_timed_out",
+    "net::err_internet_disconnected",
+    "net::err_empty_response",
+    "net::err_http2",
+    "target closed",
+    "browser has been closed",
+    "connection reset",
+    "temporarily unavailable",
+    "no content retrieved",
+)
+
+# Substrings that mean another attempt would get the same answer
+PERMANENT_MARKERS = (
+    "net::err_name_not_resolved",
+    "net::err_cert",
+    "net::err_ssl",
+    "net::err_aborted",
+    "net::err_unknown_url_scheme",
+    "net::err_invalid_url",
+    "net::err_too_many_redirects",
+    "download is starting",
+)
+
+TRANSIENT_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    page_timeout: float = 60.0
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    jitter: float = 0.5
+
+    def classify(self, error: str, status_code: Optional[int] = None) -> str:
+        """Classify a failure as transient (retry later) or permanent"""
+        if status_code is not None:
+            if status_code in TRANSIENT_STATUS_CODES:
+                return TRANSIENT
+            if 400 <= status_code < 500:
+                return PERMANENT
+        message = (error or "").lower()
+        if any(marker in message for marker in PERMANENT_MARKERS):
+            return PERMANENT
+        if any(marker in message for marker in TRANSIENT_MARKERS):
+            return TRANSIENT
+        # Unknown failures get the benefit of the doubt
+        return TRANSIENT
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff for the given (1-based) attempt, randomized by +/- `jitter` of the delay"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        spread = delay * self.jitter
+        return max(0.0, delay - spread + random.random() * 2 * spread)
+
+@dataclass
+class FailedURL:
+    url: str
+    error: str
+    kind: str = TRANSIENT
+    attempts: int = 1
+    status_code: Optional[int] = None
+
+class RetryQueue:
+    """Failed URLs deferred until after the main crawl pass"""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.pending: Dict[str, FailedURL] = {}
+        self.failed: Dict[str, FailedURL] = {}
+
+    def record_failure(self, url: str, error: str, status_code: Optional[int] = None):
+        """Defer a transient failure or give up on a permanent/exhausted one"""
+        previous = self.pending.pop(url, None)
+        attempts = previous.attempts + 1 if previous else 1
+        kind = self.policy.classify(error, status_code)
+        failure = FailedURL(url=url, error=error, kind=kind,
+                            attempts=attempts, status_code=status_code)
+        if kind == TRANSIENT and attempts < self.policy.max_attempts:
+            self.pending[url] = failure
+        else:
+            self.failed[url] = failure
+
+    def record_success(self, url: str):
+        self.pending.pop(url, None)
+        self.failed.pop(url, None)
+
+    def abandon_pending(self, reason: str):
+        """Give up on every URL still waiting for a retry, e.g. when the crawl budget ran out"""
+        for url, failure in self.pending.items():
+            failure.error = f"{reason} (last error: {failure.error})"
+            self.failed[url] = failure
+        self.pending = {}
+
+    def next_round(self) -> List[FailedURL]:
+        """Take every pending URL for the next retry pass"""
+        return list(self.pending.values())
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def report(self) -> Dict[str, str]:
+        """Final per-URL failure reasons"""
+        return {
+            url: f"{failure.kind} after {failure.attempts} attempt(s): {failure.error}"
+            for url, failure in self.failed.items()
+        }
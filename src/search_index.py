@@ -0,0 +1,148 @@
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.webcrawler/search.db")
+
+@dataclass
+class SearchHit:
+    url: str
+    title: str
+    snippet: str
+    score: float
+
+def _page_title(markdown: str) -> str:
+    """First markdown heading, or the first non-empty line"""
+    match = re.search(r'^#{1,6}\s+(.+)$', markdown, re.MULTILINE)
+    if match:
+        return match.group(1).strip()[:200]
+    for line in markdown.splitlines():
+        if line.strip():
+            return line.strip()[:200]
+    return ""
+
+class SearchIndex:
+    """Local SQLite FTS5 full-text index over crawled pages.
+
+    Pages are added one at a time as they finish crawling; writes are
+    committed every `commit_every` pages (and on flush) so indexing never
+    dominates crawl time. Queries are ranked with BM25 and return snippets.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, commit_every: int = 50):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        # Written from the crawler thread, queried from the UI thread
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                job TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                title, body, tokenize='porter unicode61'
+            );
+        """)
+
+    def add(self, url: str, markdown: str, job: Optional[str] = None):
+        """Index (or re-index) one page"""
+        with self._lock:
+            row = self._db.execute("SELECT id FROM docs WHERE url = ?", (url,)).fetchone()
+            if row:
+                doc_id = row[0]
+                self._db.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+                self._db.execute("UPDATE docs SET job = ? WHERE id = ?", (job, doc_id))
+            else:
+                doc_id = self._db.execute(
+                    "INSERT INTO docs (url, job) VALUES (?, ?)", (url, job)
+                ).lastrowid
+            self._db.execute(
+                "INSERT INTO docs_fts (rowid, title, body) VALUES (?, ?, ?)",
+                (doc_id, _page_title(markdown), markdown)
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._db.commit()
+                self._pending = 0
+
+    def add_many(self, pages: Dict[str, str], job: Optional[str] = None):
+        for url, markdown in pages.items():
+            self.add(url, markdown, job)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._db.commit()
+            self._pending = 0
+
+    def _match(self, sql: str, query: str, params: tuple):
+        try:
+            return self._db.execute(sql, (query,) + params).fetchall()
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax; fall back to matching the words literally
+            terms = re.findall(r'\w+', query)
+            if not terms:
+                return []
+            literal = ' '.join(f'"{term}"' for term in terms)
+            return self._db.execute(sql, (literal,) + params).fetchall()
+
+    def search(self, query: str, limit: int = 50, job: Optional[str] = None) -> List[SearchHit]:
+        """Ranked full-text search with highlighted snippets"""
+        if not query.strip():
+            return []
+        sql = (
+            "SELECT d.url, docs_fts.title, "
+            "snippet(docs_fts, 1, '[', ']', '...', 16), bm25(docs_fts, 5.0, 1.0) AS score "
+            "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+            "WHERE docs_fts MATCH ?"
+        )
+        params: tuple = ()
+        if job:
+            sql += " AND d.job = ?"
+            params += (job,)
+        sql += " ORDER BY score LIMIT ?"
+        params += (limit,)
+        with self._lock:
+            rows = self._match(sql, query, params)
+        return [SearchHit(url=url, title=title, snippet=snippet, score=-score)
+                for url, title, snippet, score in rows]
+
+    def matching_pages(self, query: str, job: Optional[str] = None) -> Dict[str, str]:
+        """All pages matching a query, in rank order, for filtered export"""
+        sql = (
+            "SELECT d.url, docs_fts.body FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+            "WHERE docs_fts MATCH ?"
+        )
+        params: tuple = ()
+        if job:
+            sql += " AND d.job = ?"
+            params += (job,)
+        sql += " ORDER BY bm25(docs_fts, 5.0, 1.0)"
+        with self._lock:
+            rows = self._match(sql, query, params)
+        return dict(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM docs")
+            self._db.execute("DELETE FROM docs_fts")
+            self._db.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
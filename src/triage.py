@@ -0,0 +1,118 @@
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+ROUTE_BROWSER = "browser"  # Render in headless Chromium
+ROUTE_DIRECT = "direct"    # Plain text/XML: fetch the body over HTTP
+ROUTE_SKIP = "skip"        # Binary or otherwise useless for markdown
+
+BINARY_EXTENSIONS = {
+    ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar",
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".bmp", ".tif", ".tiff", ".avif",
+    ".mp3", ".wav", ".ogg", ".m4a", ".flac", ".mp4", ".m4v", ".mov", ".avi", ".webm", ".mkv",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt", ".ods", ".odp",
+    ".exe", ".dmg", ".msi", ".pkg", ".deb", ".rpm", ".apk", ".iso", ".bin",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".css", ".js", ".map",
+}
+TEXT_EXTENSIONS = {".txt", ".md", ".xml", ".rss", ".atom", ".json", ".csv", ".yaml", ".yml"}
+HTML_EXTENSIONS = {".html", ".htm", ".xhtml", ".php", ".asp", ".aspx", ".jsp", ".shtml"}
+
+TEXT_CONTENT_TYPES = (
+    "text/plain", "text/markdown", "text/xml", "text/csv",
+    "application/xml", "application/rss+xml", "application/atom+xml", "application/json",
+)
+
+def route_for_content_type(content_type: str) -> str:
+    content_type = (content_type or "").split(';')[0].strip().lower()
+    if not content_type or content_type in ("text/html", "application/xhtml+xml"):
+        return ROUTE_BROWSER
+    if content_type in TEXT_CONTENT_TYPES or content_type.endswith("+xml"):
+        return ROUTE_DIRECT
+    return ROUTE_SKIP
+
+class ContentTriage:
+    """Cheap pre-flight routing of URLs before they reach the browser.
+
+    The URL extension decides most cases. Anything else gets a pooled HEAD
+    request, whose content type is cached per URL in `type_cache` (which
+    can be shared between crawlers). HEAD failures fall back to the browser.
+    """
+
+    def __init__(self, type_cache: Optional[Dict[str, str]] = None,
+                 max_connections: int = 16, head_timeout: float = 10.0):
+        self.type_cache: Dict[str, str] = type_cache if type_cache is not None else {}
+        self.max_connections = max_connections
+        self.head_timeout = head_timeout
+        self.skipped: Dict[str, str] = {}
+        self.direct_count = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def reset_stats(self):
+        self.skipped = {}
+        self.direct_count = 0
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.head_timeout),
+                headers={"User-Agent": "Mozilla/5.0 (compatible; WebCrawler)"}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def route(self, url: str) -> Tuple[str, str]:
+        """Return (route, content type or reason) for a URL"""
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+        if extension in BINARY_EXTENSIONS:
+            return ROUTE_SKIP, f"extension {extension}"
+        if extension in TEXT_EXTENSIONS:
+            return ROUTE_DIRECT, f"extension {extension}"
+        if extension in HTML_EXTENSIONS:
+            return ROUTE_BROWSER, "text/html"
+
+        content_type = self.type_cache.get(url)
+        if content_type is None:
+            content_type = await self._head(url)
+            self.type_cache[url] = content_type
+        return route_for_content_type(content_type), content_type or "unknown"
+
+    async def _head(self, url: str) -> str:
+        session = await self._get_session()
+        try:
+            async with self._semaphore:
+                async with session.head(url, allow_redirects=True) as response:
+                    if response.status >= 400:
+                        return ""  # Many servers reject HEAD; let the browser decide
+                    return response.headers.get("Content-Type", "")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return ""
+
+    async def fetch_text(self, url: str, timeout: float) -> Tuple[str, Optional[str], Optional[int]]:
+        """Fetch a plain text/XML body directly, returning (text, error, status_code)"""
+        session = await self._get_session()
+        try:
+            async with self._semaphore:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status >= 400:
+                        return "", f"HTTP {response.status}", response.status
+                    text = await response.text(errors="replace")
+                    self.direct_count += 1
+                    return text, None, response.status
+        except asyncio.TimeoutError:
+            return "", f"Timed out after {timeout:.0f}s", None
+        except aiohttp.ClientError as e:
+            return "", str(e), None
+
+    def summary(self) -> str:
+        return f"{len(self.skipped)} non-HTML skipped, {self.direct_count} fetched directly"
@@ -1,58 +1,92 @@
 import sys
 import os
 import asyncio
+import logging
 import psutil
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTabWidget, QLineEdit, QPushButton, QLabel,
     QProgressBar, QSpinBox, QFileDialog, QMessageBox,
-    QFrame
+    QFrame, QCheckBox, QComboBox, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView, QTableView, QPlainTextEdit, QSplitter
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QDateTime
 from PyQt6.QtGui import QKeyEvent, QKeySequence
-from typing import Optional
+from typing import Optional, Mapping, Tuple
+from urllib.parse import urlparse
 from src.crawler import WebCrawler, CrawlProgress
+from src.ui.results_model import CrawlResultsModel
+from src.blocking import ResourceBlockProfile
+from src.page_cache import PageCache, PageCacheMode
+from src.jobs import JobQueue, CrawlJob
+from src.search_index import SearchIndex
+from src.triage import ContentTriage
+from src.extraction import ExtractionProfiles
+from src.readiness import ReadinessProfiles
+from src.corpus import CORPUS_SUFFIX
+from src.log_config import get_logger
+from src.warc import WarcWriter
+from src.profiling import session_for_run, profiling_requested
+from src.crawl_scope import CrawlScope, ORDER_DOCUMENT, ORDER_PRIORITY, ORDER_LASTMOD, ORDER_DEPTH, ORDER_IMPORTANCE
+from src.link_graph import DEFAULT_GRAPH_DIR
+from src.url_list import UrlListSource
+
+logger = get_logger("ui")
 
 class CrawlerThread(QThread):
     progress_updated = pyqtSignal(CrawlProgress)
-    finished = pyqtSignal(dict)
+    page_finished = pyqtSignal(object)
+    finished = pyqtSignal(object)  # dict or PageStore
     error = pyqtSignal(str)
     status_update = pyqtSignal(str)
 
-    def __init__(self, crawler: WebCrawler, mode: str, url: str, max_concurrent: int = 5):
+    def __init__(self, crawler: WebCrawler, mode: str, url: str, max_concurrent: int = 5,
+                 scope: Optional[CrawlScope] = None, profile: bool = False,
+                 source: Optional[UrlListSource] = None):
         super().__init__()
         self.crawler = crawler
         self.mode = mode
         self.url = url
         self.max_concurrent = max_concurrent
+        self.scope = scope
+        self.profile = profile
+        self.source = source  # URL list for "list" mode
         self._is_running = False
         self.loop = None
 
     def run(self):
+        profile_session = session_for_run(self.mode, self.profile)
         try:
             self._is_running = True
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
+            if profile_session:
+                profile_session.start()
             
             if self.mode == "single":
-                result = self.loop.run_until_complete(
-                    self.crawler.crawl_single_page(self.url)
-                )
-                if self._is_running:
-                    self.finished.emit({"result": result})
+                crawl = self.crawler.crawl_single_page(self.url)
+            elif self.mode == "list":
+                crawl = self.crawler.crawl_url_list(self.source, self.max_concurrent, self.scope)
             else:
-                results = self.loop.run_until_complete(
-                    self.crawler.crawl_sitemap(self.url, self.max_concurrent)
-                )
-                if self._is_running:
-                    self.finished.emit(results)
+                crawl = self.crawler.crawl_sitemap(self.url, self.max_concurrent, self.scope)
+            if profile_session:
+                crawl = profile_session.watch(crawl)
+            result = self.loop.run_until_complete(crawl)
+            
+            if self._is_running:
+                if self.mode == "single":
+                    self.finished.emit({"result": result})
+                else:
+                    self.finished.emit(result)
             
         except Exception as e:
-            print(f"Error in crawler thread: {str(e)}")
+            logger.error("Error in crawler thread: %s", e, exc_info=True)
             if self._is_running:
                 self.error.emit(str(e))
         finally:
+            if profile_session:
+                profile_session.stop()
             self._is_running = False
             if self.loop and self.loop.is_running():
                 self.loop.close()
@@ -62,6 +96,40 @@ class CrawlerThread(QThread):
         if self.loop and self.loop.is_running():
             self.loop.stop()
 
+class JobQueueThread(QThread):
+    """Hosts the JobQueue event loop; job updates are relayed as Qt signals"""
+    job_updated = pyqtSignal(object)
+
+    def __init__(self, template: WebCrawler, max_in_flight: int = 10):
+        super().__init__()
+        self.queue = JobQueue(template, self.job_updated.emit, max_in_flight=max_in_flight)
+        self.loop = None
+
+    def run(self):
+        try:
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.queue.serve())
+        except Exception as e:
+            logger.error("Error in job queue thread: %s", e, exc_info=True)
+        finally:
+            if self.loop:
+                self.loop.close()
+
+    def submit(self, mode: str, url: str, max_concurrent: int,
+               scope: Optional[CrawlScope] = None, archive: bool = False) -> CrawlJob:
+        return self.queue.submit_threadsafe(mode, url, max_concurrent, scope, archive)
+
+    def cancel(self, job_id: str):
+        self.loop.call_soon_threadsafe(self.queue.cancel, job_id)
+
+    def set_max_in_flight(self, max_in_flight: int):
+        self.loop.call_soon_threadsafe(self.queue.scheduler.set_max_in_flight, max_in_flight)
+
+    def shutdown(self):
+        self.queue.stop_threadsafe()
+        self.wait(10000)
+
 class LineEdit(QLineEdit):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -83,8 +151,19 @@ class MainWindow(QMainWindow):
 
         # Initialize variables
         self.crawler_thread: Optional[CrawlerThread] = None
-        self.crawler = WebCrawler(self.update_progress)
+        self.crawler = WebCrawler(
+            self.update_progress,
+            block_profile=ResourceBlockProfile(),
+            page_cache=PageCache(),
+            search_index=SearchIndex(),
+            triage=ContentTriage(),
+            extraction_profiles=ExtractionProfiles(),
+            readiness=ReadinessProfiles(),
+            link_graph_dir=DEFAULT_GRAPH_DIR
+        )
         self.crawled_content = {}
+        self.job_queue_thread: Optional[JobQueueThread] = None
+        self.job_rows = {}  # job_id -> table row
         
         # Set the window style
         self.setStyleSheet("""
@@ -155,6 +234,8 @@ class MainWindow(QMainWindow):
         # Add tabs
         self.setup_single_page_tab()
         self.setup_multi_page_tab()
+        self.setup_job_queue_tab()
+        self.setup_search_tab()
         
     def setup_single_page_tab(self):
         tab = QWidget()
@@ -296,6 +377,13 @@ class MainWindow(QMainWindow):
         
         # URL input with auto-sitemap functionality
         url_layout = QHBoxLayout()
+        self.source_input = QComboBox()
+        self.source_input.addItem("Sitemap", "sitemap")
+        self.source_input.addItem("URL list", "list")
+        self.source_input.setMinimumHeight(40)
+        self.source_input.setStyleSheet("color: #000000; background-color: white;")
+        self.source_input.currentIndexChanged.connect(self.update_source_inputs)
+        url_layout.addWidget(self.source_input)
         self.sitemap_url_input = LineEdit()
         self.sitemap_url_input.setPlaceholderText("Enter website URL (sitemap.xml will be appended automatically)")
         self.sitemap_url_input.setStyleSheet("""
@@ -314,7 +402,21 @@ class MainWindow(QMainWindow):
         self.sitemap_url_input.setMinimumHeight(40)
         self.sitemap_url_input.textChanged.connect(self.handle_sitemap_url_change)
         url_layout.addWidget(self.sitemap_url_input)
+        
+        # Bulk mode: pasted URLs, or a text/CSV file streamed at crawl time
+        self.url_list_path: Optional[str] = None
+        self.url_list_input = QPlainTextEdit()
+        self.url_list_input.setPlaceholderText("Paste URLs, one per line (CSV rows work too), or load a file")
+        self.url_list_input.setStyleSheet("color: #000000; background-color: white; border: 1px solid #e0e0e0;")
+        self.url_list_input.setMaximumHeight(100)
+        self.url_list_input.textChanged.connect(self.clear_url_list_file)
+        url_layout.addWidget(self.url_list_input)
+        self.url_list_file_button = QPushButton("Load file...")
+        self.url_list_file_button.setStyleSheet("color: #000000; background-color: white; padding: 8px;")
+        self.url_list_file_button.clicked.connect(self.choose_url_list_file)
+        url_layout.addWidget(self.url_list_file_button)
         layout.addLayout(url_layout)
+        self.update_source_inputs()
         
         # Max concurrent setting
         concurrent_layout = QHBoxLayout()
@@ -361,7 +463,101 @@ class MainWindow(QMainWindow):
         """)
         concurrent_layout.addWidget(concurrent_label)
         concurrent_layout.addWidget(self.max_concurrent_input)
+        
+        # Treat the spinbox as a starting point and let throughput/latency steer it
+        self.autotune_checkbox = QCheckBox("Auto-tune")
+        self.autotune_checkbox.setStyleSheet("color: #000000; font-size: 14px;")
+        self.autotune_checkbox.setToolTip("Adjust concurrency during the crawl from observed throughput, latency and errors")
+        concurrent_layout.addWidget(self.autotune_checkbox)
         concurrent_layout.addStretch()
+        
+        # Skip images, fonts, video and tracker scripts we never export
+        self.block_resources_checkbox = QCheckBox("Block images, media & trackers")
+        self.block_resources_checkbox.setStyleSheet("color: #000000; font-size: 14px;")
+        self.block_resources_checkbox.setChecked(self.crawler.block_profile.enabled)
+        self.block_resources_checkbox.toggled.connect(self.toggle_resource_blocking)
+        concurrent_layout.addWidget(self.block_resources_checkbox)
+        
+        # Learn each site's content/chrome selectors and scope markdown to main content
+        self.extraction_checkbox = QCheckBox("Main content only")
+        self.extraction_checkbox.setStyleSheet("color: #000000; font-size: 14px;")
+        self.extraction_checkbox.setChecked(self.crawler.extraction_profiles.enabled)
+        self.extraction_checkbox.toggled.connect(self.toggle_extraction_profiles)
+        concurrent_layout.addWidget(self.extraction_checkbox)
+        
+        # Capture cProfile/tracemalloc/loop-lag data for this run
+        self.profile_checkbox = QCheckBox("Profile run")
+        self.profile_checkbox.setStyleSheet("color: #000000; font-size: 14px;")
+        self.profile_checkbox.setChecked(profiling_requested())
+        concurrent_layout.addWidget(self.profile_checkbox)
+        
+        # Archive rendered HTML so extraction can be re-run offline (python -m src.warc)
+        self.warc_checkbox = QCheckBox("Save WARC")
+        self.warc_checkbox.setStyleSheet("color: #000000; font-size: 14px;")
+        concurrent_layout.addWidget(self.warc_checkbox)
+        
+        # Page cache mode: reuse earlier renders while iterating on export settings
+        cache_label = QLabel("Page Cache:")
+        cache_label.setStyleSheet("color: #000000; font-size: 14px;")
+        self.cache_mode_input = QComboBox()
+        self.cache_mode_input.addItem("Read-through", PageCacheMode.READ_THROUGH)
+        self.cache_mode_input.addItem("Refresh", PageCacheMode.REFRESH)
+        self.cache_mode_input.addItem("Bypass", PageCacheMode.BYPASS)
+        self.cache_mode_input.setStyleSheet("color: #000000; background-color: white;")
+        concurrent_layout.addWidget(cache_label)
+        concurrent_layout.addWidget(self.cache_mode_input)
+        
+        # URL scope: include/exclude patterns, ordering and budgets
+        scope_input_style = """
+            QLineEdit {
+                border: 1px solid #e0e0e0;
+                border-radius: 4px;
+                padding: 5px;
+                color: #000000;
+                background-color: white;
+            }
+        """
+        scope_layout = QHBoxLayout()
+        self.include_patterns_input = LineEdit()
+        self.include_patterns_input.setPlaceholderText("Include patterns (comma separated, e.g. /docs/)")
+        self.include_patterns_input.setStyleSheet(scope_input_style)
+        self.exclude_patterns_input = LineEdit()
+        self.exclude_patterns_input.setPlaceholderText("Exclude patterns (e.g. /tag/, /page/*, /fr/)")
+        self.exclude_patterns_input.setStyleSheet(scope_input_style)
+        scope_layout.addWidget(self.include_patterns_input)
+        scope_layout.addWidget(self.exclude_patterns_input)
+        layout.addLayout(scope_layout)
+        
+        budget_layout = QHBoxLayout()
+        order_label = QLabel("Order:")
+        order_label.setStyleSheet("color: #000000; font-size: 14px;")
+        self.order_input = QComboBox()
+        self.order_input.addItem("Sitemap order", ORDER_DOCUMENT)
+        self.order_input.addItem("Priority", ORDER_PRIORITY)
+        self.order_input.addItem("Last modified", ORDER_LASTMOD)
+        self.order_input.addItem("Path depth", ORDER_DEPTH)
+        self.order_input.addItem("Link importance", ORDER_IMPORTANCE)
+        self.order_input.setStyleSheet("color: #000000; background-color: white;")
+        budget_layout.addWidget(order_label)
+        budget_layout.addWidget(self.order_input)
+        
+        self.max_pages_input = QSpinBox()
+        self.max_pages_input.setRange(0, 1000000)
+        self.max_pages_input.setSpecialValueText("No page limit")
+        self.max_pages_input.setSuffix(" pages")
+        self.max_mb_input = QSpinBox()
+        self.max_mb_input.setRange(0, 100000)
+        self.max_mb_input.setSpecialValueText("No size limit")
+        self.max_mb_input.setSuffix(" MB")
+        self.max_minutes_input = QSpinBox()
+        self.max_minutes_input.setRange(0, 10000)
+        self.max_minutes_input.setSpecialValueText("No time limit")
+        self.max_minutes_input.setSuffix(" min")
+        for budget_input in (self.max_pages_input, self.max_mb_input, self.max_minutes_input):
+            budget_input.setStyleSheet("color: #000000; background-color: white;")
+            budget_layout.addWidget(budget_input)
+        budget_layout.addStretch()
+        layout.addLayout(budget_layout)
         layout.addLayout(concurrent_layout)
         
         # Status section
@@ -418,6 +614,31 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(status_layout)
         
+        # Live per-URL results; markdown is only loaded for the selected row
+        self.results_model = CrawlResultsModel(self)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.results_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.results_view.verticalHeader().setDefaultSectionSize(22)
+        self.results_view.verticalHeader().hide()
+        self.results_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.results_view.setWordWrap(False)
+        self.results_view.setStyleSheet("color: #000000; background-color: white;")
+        self.results_view.selectionModel().currentRowChanged.connect(self.show_result_preview)
+        
+        self.result_preview = QPlainTextEdit()
+        self.result_preview.setReadOnly(True)
+        self.result_preview.setPlaceholderText("Select a page to preview its content")
+        self.result_preview.setStyleSheet("color: #000000; background-color: white;")
+        
+        results_splitter = QSplitter(Qt.Orientation.Vertical)
+        results_splitter.addWidget(self.results_view)
+        results_splitter.addWidget(self.result_preview)
+        results_splitter.setSizes([300, 120])
+        layout.addWidget(results_splitter, 1)
+        
         # Buttons
         button_layout = QHBoxLayout()
         button_layout.setSpacing(10)
@@ -466,6 +687,346 @@ class MainWindow(QMainWindow):
         
         self.tabs.addTab(tab, "Multi-Page Crawler")
 
+    def setup_job_queue_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(30, 30, 30, 30)
+        layout.setSpacing(20)
+        
+        input_style = """
+            QLineEdit {
+                border: 1px solid #e0e0e0;
+                border-radius: 4px;
+                padding: 10px;
+                font-size: 14px;
+                color: #000000;
+                background-color: white;
+            }
+            QLineEdit:focus {
+                border: 1px solid #000000;
+            }
+        """
+        
+        # Job input: URL, mode and per-job concurrency
+        url_layout = QHBoxLayout()
+        self.job_url_input = LineEdit()
+        self.job_url_input.setPlaceholderText("Enter page URL or sitemap URL...")
+        self.job_url_input.setStyleSheet(input_style)
+        self.job_url_input.setMinimumHeight(40)
+        self.job_mode_input = QComboBox()
+        self.job_mode_input.addItem("Sitemap", "sitemap")
+        self.job_mode_input.addItem("Single Page", "single")
+        self.job_mode_input.setStyleSheet("color: #000000; background-color: white;")
+        url_layout.addWidget(self.job_url_input)
+        url_layout.addWidget(self.job_mode_input)
+        layout.addLayout(url_layout)
+        
+        settings_layout = QHBoxLayout()
+        job_concurrent_label = QLabel("Per-Job Concurrency:")
+        job_concurrent_label.setStyleSheet("color: #000000; font-size: 14px;")
+        self.job_concurrent_input = QSpinBox()
+        self.job_concurrent_input.setRange(1, 20)
+        self.job_concurrent_input.setValue(5)
+        self.job_concurrent_input.setFixedWidth(100)
+        global_cap_label = QLabel("Global Concurrency Cap:")
+        global_cap_label.setStyleSheet("color: #000000; font-size: 14px;")
+        self.global_cap_input = QSpinBox()
+        self.global_cap_input.setRange(1, 50)
+        self.global_cap_input.setValue(10)
+        self.global_cap_input.setFixedWidth(100)
+        self.global_cap_input.valueChanged.connect(self.update_global_cap)
+        settings_layout.addWidget(job_concurrent_label)
+        settings_layout.addWidget(self.job_concurrent_input)
+        settings_layout.addWidget(global_cap_label)
+        settings_layout.addWidget(self.global_cap_input)
+        settings_layout.addStretch()
+        layout.addLayout(settings_layout)
+        
+        # Job table
+        self.job_table = QTableWidget(0, 6)
+        self.job_table.setHorizontalHeaderLabels(["Job", "Mode", "URL", "Status", "Pages", "Failed"])
+        self.job_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.job_table.setStyleSheet("color: #000000; background-color: white;")
+        layout.addWidget(self.job_table)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+        
+        button_style = """
+            QPushButton {
+                padding: 12px 30px;
+                border-radius: 4px;
+                font-size: 14px;
+                border: 1px solid black;
+                color: black;
+                background-color: white;
+            }
+        """
+        self.job_add_button = QPushButton("Add Job")
+        self.job_cancel_button = QPushButton("Cancel Selected")
+        self.job_export_button = QPushButton("Export Selected")
+        self.job_add_button.setStyleSheet(button_style + """
+            background-color: black;
+            color: white;
+            border: none;
+        """)
+        self.job_cancel_button.setStyleSheet(button_style)
+        self.job_export_button.setStyleSheet(button_style)
+        
+        self.job_add_button.clicked.connect(self.add_job)
+        self.job_cancel_button.clicked.connect(self.cancel_selected_job)
+        self.job_export_button.clicked.connect(self.export_selected_job)
+        
+        button_layout.addWidget(self.job_add_button)
+        button_layout.addWidget(self.job_cancel_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.job_export_button)
+        layout.addLayout(button_layout)
+        
+        self.tabs.addTab(tab, "Job Queue")
+
+    def setup_search_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(30, 30, 30, 30)
+        layout.setSpacing(20)
+        
+        query_layout = QHBoxLayout()
+        self.search_input = LineEdit()
+        self.search_input.setPlaceholderText("Search crawled pages...")
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                border: 1px solid #e0e0e0;
+                border-radius: 4px;
+                padding: 10px;
+                font-size: 14px;
+                color: #000000;
+                background-color: white;
+            }
+            QLineEdit:focus {
+                border: 1px solid #000000;
+            }
+        """)
+        self.search_input.setMinimumHeight(40)
+        self.search_input.returnPressed.connect(self.run_search)
+        query_layout.addWidget(self.search_input)
+        layout.addLayout(query_layout)
+        
+        self.search_summary_label = QLabel("Indexed pages: 0")
+        self.search_summary_label.setStyleSheet("color: #000000;")
+        layout.addWidget(self.search_summary_label)
+        
+        self.search_table = QTableWidget(0, 3)
+        self.search_table.setHorizontalHeaderLabels(["Score", "URL", "Snippet"])
+        self.search_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.search_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.search_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.search_table.setWordWrap(True)
+        self.search_table.setStyleSheet("color: #000000; background-color: white;")
+        layout.addWidget(self.search_table)
+        
+        button_layout = QHBoxLayout()
+        button_style = """
+            QPushButton {
+                padding: 12px 30px;
+                border-radius: 4px;
+                font-size: 14px;
+                border: 1px solid black;
+                color: black;
+                background-color: white;
+            }
+        """
+        self.search_button = QPushButton("Search")
+        self.search_export_button = QPushButton("Export Matches")
+        self.search_button.setStyleSheet(button_style + """
+            background-color: black;
+            color: white;
+            border: none;
+        """)
+        self.search_export_button.setStyleSheet(button_style)
+        self.search_button.clicked.connect(self.run_search)
+        self.search_export_button.clicked.connect(self.export_search_matches)
+        button_layout.addWidget(self.search_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.search_export_button)
+        layout.addLayout(button_layout)
+        
+        self.tabs.addTab(tab, "Search")
+
+    def run_search(self):
+        try:
+            query = self.search_input.text().strip()
+            hits = self.crawler.search_index.search(query, limit=200)
+            self.search_summary_label.setText(
+                f"Indexed pages: {self.crawler.search_index.count()} - {len(hits)} matches")
+            self.search_table.setRowCount(len(hits))
+            for row, hit in enumerate(hits):
+                self.search_table.setItem(row, 0, QTableWidgetItem(f"{hit.score:.2f}"))
+                self.search_table.setItem(row, 1, QTableWidgetItem(hit.url))
+                self.search_table.setItem(row, 2, QTableWidgetItem(hit.snippet.replace("\n", " ")))
+        except Exception as e:
+            logger.error("Error in run_search: %s", e)
+            QMessageBox.critical(self, "Error", f"Search failed: {str(e)}")
+
+    def export_search_matches(self):
+        query = self.search_input.text().strip()
+        if not query:
+            QMessageBox.warning(self, "Error", "Please enter a search query")
+            return
+        self.export_content(self.crawler.search_index.matching_pages(query))
+
+    def ensure_job_queue(self) -> JobQueueThread:
+        """Start the shared job queue thread on first use"""
+        if self.job_queue_thread is None:
+            self.job_queue_thread = JobQueueThread(self.crawler, self.global_cap_input.value())
+            self.job_queue_thread.job_updated.connect(self.update_job_row)
+            self.job_queue_thread.start()
+        return self.job_queue_thread
+
+    def add_job(self):
+        try:
+            url = self.job_url_input.text().strip()
+            if not url:
+                QMessageBox.warning(self, "Error", "Please enter a URL")
+                return
+            mode = self.job_mode_input.currentData()
+            self.crawler.cache_mode = self.cache_mode_input.currentData()
+            self.crawler.autotune_bounds = self.autotune_bounds()
+            job = self.ensure_job_queue().submit(mode, url, self.job_concurrent_input.value(),
+                                                 self.build_scope(), self.warc_checkbox.isChecked())
+            logger.info("Queued %s: %s %s", job.job_id, mode, url)
+            self.update_job_row(job)
+            self.job_url_input.clear()
+        except Exception as e:
+            logger.error("Error in add_job: %s", e)
+            QMessageBox.critical(self, "Error", f"Failed to queue job: {str(e)}")
+
+    def update_job_row(self, job: CrawlJob):
+        """Insert or refresh the table row for a job"""
+        row = self.job_rows.get(job.job_id)
+        if row is None:
+            row = self.job_table.rowCount()
+            self.job_table.insertRow(row)
+            self.job_rows[job.job_id] = row
+        
+        pages = "0"
+        if job.progress:
+            pages = f"{job.progress.pages_crawled}/{job.progress.total_pages}"
+        status = job.status
+        if job.progress and job.status == "running":
+            status = job.progress.status
+        elif job.error:
+            status = f"{job.status}: {job.error}"
+        
+        values = [job.job_id, job.mode, job.url, status, pages, str(len(job.failed_urls))]
+        for column, value in enumerate(values):
+            self.job_table.setItem(row, column, QTableWidgetItem(value))
+
+    def selected_job_id(self) -> Optional[str]:
+        rows = self.job_table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        item = self.job_table.item(rows[0].row(), 0)
+        return item.text() if item else None
+
+    def cancel_selected_job(self):
+        job_id = self.selected_job_id()
+        if job_id and self.job_queue_thread:
+            self.job_queue_thread.cancel(job_id)
+
+    def export_selected_job(self):
+        job_id = self.selected_job_id()
+        if not job_id or not self.job_queue_thread:
+            QMessageBox.warning(self, "Error", "Please select a job")
+            return
+        job = self.job_queue_thread.queue.jobs.get(job_id)
+        self.export_content(job.results if job else {}, job.scores if job else None)
+
+    def update_global_cap(self, value: int):
+        if self.job_queue_thread and self.job_queue_thread.loop:
+            self.job_queue_thread.set_max_in_flight(value)
+
+    def closeEvent(self, event):
+        if self.job_queue_thread:
+            self.job_queue_thread.shutdown()
+        super().closeEvent(event)
+
+    def build_scope(self) -> CrawlScope:
+        """Collect the sitemap filter, order and budget settings"""
+        def patterns(text: str):
+            return [part.strip() for part in text.split(',') if part.strip()]
+        return CrawlScope(
+            include=patterns(self.include_patterns_input.text()),
+            exclude=patterns(self.exclude_patterns_input.text()),
+            order=self.order_input.currentData(),
+            max_pages=self.max_pages_input.value(),
+            max_bytes=self.max_mb_input.value() * 1024 * 1024,
+            max_seconds=self.max_minutes_input.value() * 60
+        )
+
+    def show_result_preview(self, current, previous=None):
+        """Load the markdown for the selected row on demand"""
+        if not current.isValid():
+            self.result_preview.clear()
+            return
+        record = self.results_model.record_at(current.row())
+        content = self.crawler.crawled_content.get(record.url) or ""
+        if not content and record.error:
+            content = f"Error: {record.error}"
+        preview_limit = 20000
+        if len(content) > preview_limit:
+            content = content[:preview_limit] + "\n\n[... preview truncated ...]"
+        self.result_preview.setPlainText(content)
+
+    def toggle_resource_blocking(self, enabled: bool):
+        """Turn request blocking on or off; applies from the next request, on every browser"""
+        self.crawler.block_profile.enabled = enabled
+
+    def autotune_bounds(self) -> Optional[Tuple[int, int]]:
+        if not self.autotune_checkbox.isChecked():
+            return None
+        return (self.max_concurrent_input.minimum(), self.max_concurrent_input.maximum())
+
+    def toggle_extraction_profiles(self, enabled: bool):
+        """Turn per-domain main-content extraction on or off for the next crawl"""
+        self.crawler.extraction_profiles.enabled = enabled
+
+    def update_source_inputs(self):
+        """Show the sitemap URL field or the URL-list inputs for the selected source"""
+        use_list = self.source_input.currentData() == "list"
+        self.sitemap_url_input.setVisible(not use_list)
+        self.url_list_input.setVisible(use_list)
+        self.url_list_file_button.setVisible(use_list)
+
+    def choose_url_list_file(self):
+        filepath, _ = QFileDialog.getOpenFileName(
+            self,
+            "Load URL List",
+            "",
+            "URL Lists (*.txt *.csv *.tsv);;All Files (*)"
+        )
+        if filepath:
+            self.url_list_input.blockSignals(True)
+            self.url_list_input.clear()
+            self.url_list_input.blockSignals(False)
+            self.url_list_input.setPlaceholderText(f"Using {os.path.basename(filepath)} (type or paste to use a list instead)")
+            self.url_list_path = filepath
+
+    def clear_url_list_file(self):
+        """Typing or pasting URLs replaces a previously loaded file"""
+        if self.url_list_path:
+            self.url_list_path = None
+            self.url_list_input.setPlaceholderText("Paste URLs, one per line (CSV rows work too), or load a file")
+
+    def build_url_list_source(self) -> Optional[UrlListSource]:
+        if self.url_list_path:
+            return UrlListSource(path=self.url_list_path)
+        text = self.url_list_input.toPlainText()
+        return UrlListSource(text=text) if text.strip() else None
+
     def handle_sitemap_url_change(self, url: str):
         """Automatically handle sitemap URL formatting"""
         try:
@@ -481,46 +1042,27 @@ class MainWindow(QMainWindow):
                 if formatted_url != self.sitemap_url_input.text():
                     self.sitemap_url_input.setText(formatted_url)
         except Exception as e:
-            print(f"Error formatting sitemap URL: {e}")
+            logger.error("Error formatting sitemap URL: %s", e)
 
     def safe_update_ui(self, func):
         """Safely execute UI updates"""
         try:
-            print("safe_update_ui called")
             QTimer.singleShot(10, lambda: self._execute_update(func))  # Reduced from 100 to 10ms
-            print("Update scheduled with 10ms delay")
         except Exception as e:
-            print(f"Error in safe_update_ui: {str(e)}")
+            logger.error("Error in safe_update_ui: %s", e)
 
     def _execute_update(self, func):
         """Execute the update and log any errors"""
         try:
-            print("\n=== Executing UI Update ===")
-            print("Starting UI update execution")
             func()
-            
-            # Add specific progress bar value check
-            current_tab = self.tabs.currentIndex()
-            if current_tab == 1:  # Sitemap tab
-                current_value = self.sitemap_progress_bar.value()
-                current_text = self.sitemap_progress_details.text()
-                print(f"Progress bar value: {current_value}")
-                print(f"Progress details text: {current_text}")
-            
-            print("UI update completed successfully")
-            
         except Exception as e:
-            print(f"Error executing UI update: {str(e)}")
-            print(f"Error type: {type(e).__name__}")
-            import traceback
-            print(f"Stack trace: {traceback.format_exc()}")
+            logger.error("Error executing UI update: %s", e, exc_info=True)
 
     def update_progress(self, progress: CrawlProgress):
         try:
-            print("\n=== Progress Update Debug ===")
-            print(f"Pages Crawled: {progress.pages_crawled}/{progress.total_pages}")
-            print(f"Status: {progress.status}")
-            print(f"Memory: {progress.memory_usage:.1f} MB")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Progress %d/%d, %.1f MB: %s", progress.pages_crawled, progress.total_pages,
+                             progress.memory_usage, progress.status)
             
             # Direct updates for progress-related UI
             if self.tabs.currentIndex() == 1:  # Sitemap tab
@@ -529,7 +1071,6 @@ class MainWindow(QMainWindow):
                     percentage = min(100, int((progress.pages_crawled / progress.total_pages) * 100))
                     self.sitemap_progress_bar.setValue(percentage)
                     self.sitemap_progress_details.setText(f"Pages Crawled: {progress.pages_crawled}/{progress.total_pages}")
-                    print(f"Set progress bar to {percentage}% and updated text")
             
             # Use safe update for non-progress UI elements
             def update_other_ui():
@@ -541,44 +1082,60 @@ class MainWindow(QMainWindow):
                         if progress.is_complete:
                             self.sitemap_export_button.setEnabled(True)
                 except Exception as e:
-                    print(f"Error in update_other_ui: {str(e)}")
+                    logger.error("Error in update_other_ui: %s", e)
             
             self.safe_update_ui(update_other_ui)
             
         except Exception as e:
-            print(f"Error in update_progress: {str(e)}")
+            logger.error("Error in update_progress: %s", e)
 
     def start_crawling(self, mode: str):
         try:
             if self.crawler_thread and self.crawler_thread.isRunning():
-                print("Crawler already running")
+                logger.warning("Crawler already running")
                 return
                 
-            print(f"Starting {mode} crawl...")
+            logger.info("Starting %s crawl", mode)
             
+            source = None
             if mode == "single":
                 url = self.single_url_input.text().strip()
                 if not url:
                     QMessageBox.warning(self, "Error", "Please enter a URL")
                     return
-                print(f"Single page URL: {url}")
+                logger.debug("Single page URL: %s", url)
                 self.single_progress_bar.setValue(0)
                 self.single_start_button.setEnabled(False)
                 self.single_stop_button.setEnabled(True)
                 self.single_export_button.setEnabled(False)
                 self.single_success_label.hide()
             else:
-                url = self.sitemap_url_input.text().strip()
-                if not url:
-                    QMessageBox.warning(self, "Error", "Please enter a sitemap URL")
-                    return
-                print(f"Sitemap URL: {url}")
+                if self.source_input.currentData() == "list":
+                    source = self.build_url_list_source()
+                    if source is None:
+                        QMessageBox.warning(self, "Error", "Please paste URLs or load a URL list file")
+                        return
+                    mode = "list"
+                    url = source.describe()
+                else:
+                    url = self.sitemap_url_input.text().strip()
+                    if not url:
+                        QMessageBox.warning(self, "Error", "Please enter a sitemap URL")
+                        return
+                logger.debug("Multi-page source: %s", url)
                 self.sitemap_progress_bar.setValue(0)
                 self.sitemap_start_button.setEnabled(False)
                 self.sitemap_stop_button.setEnabled(True)
                 self.sitemap_export_button.setEnabled(False)
                 self.sitemap_success_label.hide()
+
+                self.results_model.clear()
+                self.result_preview.clear()
+                if self.warc_checkbox.isChecked():
+                    self.crawler.warc_writer = WarcWriter(prefix=urlparse(url).hostname or "crawl")
             
+            self.crawler.cache_mode = self.cache_mode_input.currentData()
+            self.crawler.autotune_bounds = self.autotune_bounds()
             self.start_time = QDateTime.currentDateTime()
             self.timer.start(1000)  # Update every second
             
@@ -586,24 +1143,30 @@ class MainWindow(QMainWindow):
                 self.crawler, 
                 mode, 
                 url, 
-                self.max_concurrent_input.value()
+                self.max_concurrent_input.value(),
+                self.build_scope(),
+                self.profile_checkbox.isChecked(),
+                source
             )
             self.crawler_thread.progress_updated.connect(self.update_progress)
             self.crawler_thread.finished.connect(self.crawling_finished)
             self.crawler_thread.error.connect(self.crawling_error)
+            self.crawler_thread.page_finished.connect(self.results_model.add_result)
+            self.crawler.page_callback = self.crawler_thread.page_finished.emit
             self.crawler_thread.start()
             
         except Exception as e:
-            print(f"Error in start_crawling: {str(e)}")
+            logger.error("Error in start_crawling: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to start crawler: {str(e)}")
             self.reset_ui_state(mode)
 
     def stop_crawling(self):
         try:
-            print("Stopping crawler...")
+            logger.info("Stopping crawler")
             if self.crawler_thread and self.crawler_thread.isRunning():
                 self.crawler_thread.terminate()
                 self.crawler_thread.wait()
+                self.close_warc_writer()  # Keep what was archived before the stop
                 
                 current_tab = self.tabs.currentIndex()
                 if current_tab == 0:  # Single page tab
@@ -621,12 +1184,12 @@ class MainWindow(QMainWindow):
                 
                 # Show message about partial export
                 if self.crawled_content:
-                    pages = len(self.crawled_content) if isinstance(self.crawled_content, dict) else 0
+                    pages = len(self.crawled_content) if isinstance(self.crawled_content, Mapping) else 0
                     QMessageBox.information(self, "Stopped", 
                         f"Crawler stopped. {pages} pages were crawled.\nYou can export the collected content.")
                 
         except Exception as e:
-            print(f"Error in stop_crawling: {str(e)}")
+            logger.error("Error in stop_crawling: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to stop crawler: {str(e)}")
 
     def reset_ui_state(self, mode: str):
@@ -669,9 +1232,9 @@ class MainWindow(QMainWindow):
                 self.sitemap_time_label.setText(f"Time Elapsed: {time_str}")
                 self.sitemap_memory_label.setText(f"Memory Usage: {memory_mb:.1f} MB")
 
-    def crawling_finished(self, results: dict):
+    def crawling_finished(self, results: Mapping):
         try:
-            print("Crawling finished successfully")
+            logger.info("Crawling finished successfully")
             self.crawled_content = results
             current_tab = self.tabs.currentIndex()
             
@@ -687,7 +1250,7 @@ class MainWindow(QMainWindow):
                 if results:
                     self.sitemap_export_button.setEnabled(True)
                     self.sitemap_success_label.show()
-                    print(f"Successfully crawled {len(results)} pages")
+                    logger.info("Successfully crawled %d pages", len(results))
                 else:
                     self.sitemap_status_label.setText("Status: No content retrieved")
                 self.sitemap_stop_button.setEnabled(False)
@@ -695,45 +1258,74 @@ class MainWindow(QMainWindow):
             
             self.timer.stop()
             message = f"Crawling completed successfully!\nPages crawled: {len(results)}"
+            if self.crawler.failed_urls:
+                message += f"\nPages failed: {len(self.crawler.failed_urls)}"
+            if self.crawler.triage and self.crawler.triage.skipped:
+                message += f"\nNon-HTML URLs skipped: {len(self.crawler.triage.skipped)}"
+            if self.crawler.tuner and self.crawler.tuner.changes:
+                report = self.crawler.tuner.report()
+                message += f"\nConcurrency: {self.crawler.tuner.summary()}\n  " + "\n  ".join(report[-10:])
+                if len(report) > 10:
+                    message += f"\n  ({len(report) - 10} earlier changes in the log)"
+            warc_writer = self.close_warc_writer()
+            if warc_writer and warc_writer.records:
+                message += f"\nPages archived to WARC: {warc_writer.records} of {len(results)} in {warc_writer.directory}"
             QMessageBox.information(self, "Success", message)
             
         except Exception as e:
-            print(f"Error in crawling_finished: {str(e)}")
+            logger.error("Error in crawling_finished: %s", e)
             self.crawling_error(str(e))
 
+    def close_warc_writer(self) -> Optional[WarcWriter]:
+        """Close and detach the current run's WARC writer, returning it for reporting"""
+        warc_writer = self.crawler.warc_writer
+        if warc_writer:
+            self.crawler.warc_writer = None
+            try:
+                warc_writer.close()
+            except:
+                pass
+        return warc_writer
+
     def crawling_error(self, error_message: str):
-        print(f"Crawling error: {error_message}")
+        self.close_warc_writer()
+        logger.error("Crawling error: %s", error_message)
         self.timer.stop()  # Stop timer on error
         QMessageBox.critical(self, "Error", f"An error occurred during crawling:\n{error_message}")
         current_tab = self.tabs.currentIndex()
         self.reset_ui_state("single" if current_tab == 0 else "sitemap")
 
     def export_results(self):
+        self.export_content(self.crawled_content, self.crawler.page_scores())
+
+    def export_content(self, crawled_content: Mapping, scores: Optional[Mapping] = None):
         try:
-            if not self.crawled_content:
+            if not crawled_content:
                 QMessageBox.warning(self, "Error", "No content to export")
                 return
             
-            filepath, _ = QFileDialog.getSaveFileName(
+            single_page = isinstance(crawled_content, Mapping) and "result" in crawled_content
+            file_filter = "Text Files (*.txt)"
+            if not single_page:
+                file_filter += ";;Indexed Corpus (*.corpus)"
+            filepath, selected_filter = QFileDialog.getSaveFileName(
                 self,
                 "Save Content",
                 "",
-                "Text Files (*.txt)"
+                file_filter
             )
             
             if filepath:
-                if not filepath.endswith('.txt'):
-                    filepath += '.txt'
-                
-                content = ""
-                if isinstance(self.crawled_content, dict):
-                    if "result" in self.crawled_content:  # Single page result
-                        content = self.crawled_content["result"]
-                    else:  # Sitemap results
-                        for url, page_content in self.crawled_content.items():
-                            content += f"\n\n=== {url} ===\n\n{page_content}"
+                extension = CORPUS_SUFFIX if "corpus" in selected_filter else '.txt'
+                if not filepath.endswith(extension):
+                    filepath += extension
                 
-                success = self.crawler.export_to_txt(content, filepath)
+                success = False
+                if isinstance(crawled_content, Mapping):
+                    if single_page:  # Single page result
+                        success = self.crawler.export_to_txt(crawled_content["result"], filepath)
+                    else:  # Sitemap results, streamed page by page
+                        success = self.crawler.export_pages(crawled_content, filepath, scores=scores)
                 if success:
                     QMessageBox.information(self, "Success", 
                         f"Content exported successfully to:\n{filepath}")
@@ -741,5 +1333,5 @@ class MainWindow(QMainWindow):
                     QMessageBox.warning(self, "Error", "Failed to export content")
                     
         except Exception as e:
-            print(f"Error in export_results: {str(e)}")
+            logger.error("Error in export_results: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to export results: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,90 @@
+from typing import Any, List
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from src.crawler import PageResult
+
+class CrawlResultsModel(QAbstractTableModel):
+    """Table model for the live per-URL results view.
+
+    Rows hold only the small PageResult records, never the markdown, so
+    memory and repaint cost stay flat no matter how large pages are.
+    Incoming records are buffered and inserted in one beginInsertRows call
+    per flush interval instead of one model reset per page.
+    """
+    COLUMNS = ["URL", "Status", "Latency", "Size", "Error"]
+
+    def __init__(self, parent=None, flush_interval_ms: int = 250):
+        super().__init__(parent)
+        self._rows: List[PageResult] = []
+        self._row_by_url = {}
+        self._pending: List[PageResult] = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        record = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return record.url
+            if column == 1:
+                return record.status
+            if column == 2:
+                return f"{record.latency:.2f}s"
+            if column == 3:
+                return f"{record.size / 1024:.1f} KB" if record.size else ""
+            if column == 4:
+                return record.error or ""
+        if role == Qt.ItemDataRole.ToolTipRole and column == 4:
+            return record.error
+        return None
+
+    def add_result(self, record: PageResult):
+        """Queue a record for the next batched insert"""
+        self._pending.append(record)
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        new_records = []
+        for record in pending:
+            row = self._row_by_url.get(record.url)
+            if row is not None and row >= len(self._rows):
+                new_records[row - len(self._rows)] = record
+            elif row is not None:
+                # A retried URL updates its existing row in place
+                self._rows[row] = record
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+            else:
+                self._row_by_url[record.url] = len(self._rows) + len(new_records)
+                new_records.append(record)
+        if new_records:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_records) - 1)
+            self._rows.extend(new_records)
+            self.endInsertRows()
+
+    def record_at(self, row: int) -> PageResult:
+        return self._rows[row]
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._row_by_url = {}
+        self._pending = []
+        self.endResetModel()
@@ -0,0 +1,269 @@
+"""WARC output for crawls, and offline re-extraction of markdown from the archives.
+
+Each crawled page is written as a WARC/1.1 response record: the page's
+status line and response headers followed by the rendered HTML (the DOM
+after JavaScript ran, which is what crawl4ai converts to markdown). Every
+record is its own gzip member, so files are standard .warc.gz that other
+tools can read and that can be split at record boundaries.
+
+    python -m src.warc ~/.webcrawler/warc/example.com-*.warc.gz --out example.txt --workers 8
+
+An --out file ending in .corpus is written in the indexed format of src.corpus.
+"""
+import argparse
+import base64
+import glob
+import gzip
+import hashlib
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.log_config import get_logger, setup_logging
+from src.page_store import PageStore
+
+DEFAULT_WARC_DIR = os.path.expanduser("~/.webcrawler/warc")
+# Headers describing the original transfer; the stored body is the DOM re-encoded as UTF-8
+_DROPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "content-type"}
+
+logger = get_logger("warc")
+
+def _warc_date() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _record(warc_type: str, block: bytes, headers: Dict[str, str]) -> bytes:
+    lines = [
+        "WARC/1.1",
+        f"WARC-Type: {warc_type}",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {_warc_date()}",
+    ]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append(f"Content-Length: {len(block)}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode('utf-8')
+    return gzip.compress(head + block + b"\r\n\r\n", compresslevel=6)
+
+class WarcWriter:
+    """Appends gzip-per-record WARC files, rolling over at `max_bytes`.
+
+    Safe to call from several threads; the crawler writes through
+    asyncio.to_thread so compression and disk I/O stay off the event loop.
+    """
+
+    def __init__(self, directory: str = DEFAULT_WARC_DIR, prefix: str = "crawl",
+                 max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.records = 0
+        self.paths: List[str] = []
+        self._file = None
+        self._size = 0
+        self._serial = 0
+        self._started = datetime.now().strftime('%Y%m%d%H%M%S')
+        self._lock = threading.Lock()
+
+    def _open_next(self):
+        if self._file:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.prefix}-{self._started}-{self._serial:05d}.warc.gz")
+        self._serial += 1
+        self._file = open(path, 'ab')
+        self._size = 0
+        self.paths.append(path)
+        info = "software: WebCrawler\r\nformat: WARC File Format 1.1\r\n".encode('utf-8')
+        self._write(_record("warcinfo", info, {
+            "WARC-Filename": os.path.basename(path),
+            "Content-Type": "application/warc-fields",
+        }))
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._size += len(data)
+
+    def write_response(self, url: str, html: str, status_code: Optional[int] = None,
+                       headers: Optional[Dict[str, str]] = None):
+        body = html.encode('utf-8')
+        status_code = status_code or 200
+        http_lines = [f"HTTP/1.1 {status_code} {'OK' if status_code < 400 else 'Error'}"]
+        for name, value in (headers or {}).items():
+            if name.lower() not in _DROPPED_HEADERS:
+                http_lines.append(f"{name}: {value}")
+        http_lines.append("Content-Type: text/html; charset=utf-8")
+        http_lines.append(f"Content-Length: {len(body)}")
+        block = ("\r\n".join(http_lines) + "\r\n\r\n").encode('utf-8') + body
+        digest = base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+        record = _record("response", block, {
+            "WARC-Target-URI": url,
+            "WARC-Payload-Digest": f"sha1:{digest}",
+            "Content-Type": "application/http; msgtype=response",
+        })
+        with self._lock:
+            if self._file is None or self._size >= self.max_bytes:
+                self._open_next()
+            self._write(record)
+            self.records += 1
+
+    def flush(self):
+        with self._lock:
+            if self._file:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+def _read_headers(stream) -> Optional[Dict[str, str]]:
+    line = stream.readline()
+    while line in (b"\r\n", b"\n"):
+        line = stream.readline()
+    if not line:
+        return None
+    headers = {}
+    for line in iter(stream.readline, b""):
+        line = line.decode('utf-8', 'replace').strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return headers
+
+def iter_warc_responses(path: str) -> Iterator[Tuple[str, int, Dict[str, str], bytes]]:
+    """Yield (url, status code, http headers, body) for every response record in a WARC file"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rb') as stream:
+        while True:
+            warc_headers = _read_headers(stream)
+            if warc_headers is None:
+                return
+            block = stream.read(int(warc_headers.get("content-length", 0)))
+            if warc_headers.get("warc-type") != "response":
+                continue
+            head, _, body = block.partition(b"\r\n\r\n")
+            head_lines = head.decode('utf-8', 'replace').split("\r\n")
+            try:
+                status_code = int(head_lines[0].split()[1])
+            except (IndexError, ValueError):
+                status_code = 0
+            http_headers = {}
+            for line in head_lines[1:]:
+                name, _, value = line.partition(":")
+                http_headers[name.strip()] = value.strip()
+            yield warc_headers.get("warc-target-uri", ""), status_code, http_headers, body
+
+def _charset(headers: Dict[str, str]) -> str:
+    for name, value in headers.items():
+        if name.lower() == "content-type" and "charset=" in value:
+            return value.split("charset=")[-1].split(";")[0].strip() or "utf-8"
+    return "utf-8"
+
+def html_to_markdown(url: str, html: str, css_selector: Optional[str] = None,
+                     excluded_selector: Optional[str] = None) -> str:
+    """Run crawl4ai's scraping and markdown generation on stored HTML, without a browser"""
+    from crawl4ai import CrawlerRunConfig
+    from crawl4ai.content_scraping_strategy import WebScrapingStrategy
+    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+
+    config = CrawlerRunConfig(css_selector=css_selector, excluded_selector=excluded_selector, verbose=False)
+    params = {k: v for k, v in config.to_dict().items() if k != "url"}
+    scraped = WebScrapingStrategy().scrap(url, html, **params)
+    # A dict up to 0.4.247, a pydantic ScrapingResult from 0.4.248
+    if isinstance(scraped, dict):
+        cleaned_html = scraped.get("cleaned_html")
+    else:
+        cleaned_html = getattr(scraped, "cleaned_html", None)
+    if not cleaned_html:
+        return ""
+    generated = DefaultMarkdownGenerator().generate_markdown(cleaned_html=cleaned_html, base_url=url)
+    return generated.raw_markdown or ""
+
+def _extract_batch(batch: List[Tuple[str, str]],
+                   selectors: Dict[str, Tuple[Optional[str], Optional[str]]]) -> List[Tuple[str, str, Optional[str]]]:
+    """Worker-process entry point: (url, markdown, error) for each (url, html)"""
+    from urllib.parse import urlparse
+    extracted = []
+    for url, html in batch:
+        css_selector, excluded_selector = selectors.get((urlparse(url).hostname or "").lower(), (None, None))
+        try:
+            extracted.append((url, html_to_markdown(url, html, css_selector, excluded_selector), None))
+        except Exception as e:
+            logger.warning("Error re-extracting %s: %s", url, e)
+            extracted.append((url, "", str(e)))
+    return extracted
+
+def reextract(paths: List[str], workers: Optional[int] = None, batch_size: int = 32,
+              use_profiles: bool = True, include_errors: bool = False) -> Tuple[PageStore, Dict[str, str]]:
+    """Rebuild markdown for every archived page, in parallel worker processes.
+
+    Records are read sequentially and handed to a process pool in batches;
+    at most two batches per worker are in flight, so memory stays flat on
+    large archives. Returns the pages in archive order plus per-URL errors.
+    With `use_profiles`, learned per-domain extraction profiles are applied.
+    """
+    selectors: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    if use_profiles:
+        from src.extraction import ExtractionProfiles
+        selectors = {profile.domain: (profile.css_selector, profile.excluded_selector or None)
+                     for profile in ExtractionProfiles().all_profiles()}
+
+    workers = workers or os.cpu_count() or 2
+    pages = PageStore()
+    errors: Dict[str, str] = {}
+    pending = deque()
+
+    def collect(future):
+        for url, markdown, error in future.result():
+            if markdown:
+                pages[url] = markdown
+            else:
+                errors[url] = error or "No content extracted"
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        batch: List[Tuple[str, str]] = []
+        for path in paths:
+            logger.info("Re-extracting %s", path)
+            for url, status_code, headers, body in iter_warc_responses(path):
+                if status_code >= 400 and not include_errors:
+                    continue
+                batch.append((url, body.decode(_charset(headers), 'replace')))
+                if len(batch) >= batch_size:
+                    pending.append(pool.submit(_extract_batch, batch, selectors))
+                    batch = []
+                    while len(pending) >= workers * 2:
+                        collect(pending.popleft())
+        if batch:
+            pending.append(pool.submit(_extract_batch, batch, selectors))
+        while pending:
+            collect(pending.popleft())
+
+    logger.info("Re-extracted %d pages, %d without content", len(pages), len(errors))
+    for url, error in list(errors.items())[:20]:
+        logger.warning("No content from %s: %s", url, error)
+    return pages, errors
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Rebuild markdown exports from WARC archives, offline")
+    parser.add_argument("warc", nargs="+", help="WARC files or glob patterns")
+    parser.add_argument("--out", required=True, help="Export file (.txt, or .corpus for the indexed format)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-profiles", action="store_true", help="Ignore learned extraction profiles")
+    parser.add_argument("--raw", action="store_true", help="Skip the RAG cleaning pass")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    paths = sorted({path for pattern in args.warc for path in (glob.glob(os.path.expanduser(pattern)) or [pattern])})
+    pages, _ = reextract(paths, workers=args.workers, use_profiles=not args.no_profiles)
+
+    from src.crawler import WebCrawler
+    WebCrawler(lambda progress: None).export_pages(pages, args.out, clean_for_rag=not args.raw)
+    logger.info("Exported %d pages to %s", len(pages), args.out)
+
+if __name__ == "__main__":
+    main()